@@ -1,4 +1,6 @@
 #!/bin/bash
 
 python scripts/serialize_palettes.py
+python scripts/write_vega_jsons.py
+python scripts/write_plotly_jsons.py
 python scripts/test_plots.py
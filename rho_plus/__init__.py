@@ -1,45 +1,58 @@
-from .matplotlib import setup as mpl_setup
-from .matplotlib import boxstyle as boxstyle
-from .matplotlib_tweaks import smart_ticks, line_labels, ylabel_top
-from .smoothing import smooth_straight_lines, smooth_noisy_lines
-from ._scatter_label import scatter_labels
-
-try:
-    import altair
-    from .vega import setup as vega_setup
-    from .vega import RHO_LIGHT as vega_rho_light
-    from .vega import RHO_DARK as vega_rho_dark
-    from .vega import _register_themes
-
-    _register_themes()
-except ModuleNotFoundError:
-    pass
-
-try:
-    import bokeh
-
-    from .bokeh import setup as bokeh_setup
-    from .bokeh import rho_light as bokeh_rho_light
-    from .bokeh import rho_dark as bokeh_rho_dark
-except ModuleNotFoundError:
-    pass
-
-try:
-    from .panel import ThemedPanel, datagrid, show_json
-    from .panel import pn_setup as panel_setup
-
-
-except ModuleNotFoundError:
-    pass
-
-try:
-    import plotly
-    from .plotly import setup as plotly_setup
-    from .plotly import register_themes as _register_themes
-
-    _register_themes()
-
-except ModuleNotFoundError:
-    pass
+from importlib import import_module
 
 from .sequential_palettes import *
+
+# Everything else is imported on first access, so importing rho_plus doesn't import
+# pyplot, scipy, or any of the plotting backends, and doesn't touch their global state.
+# The backend modules register their themes when they are imported.
+_LAZY = {
+    "mpl_setup": ("matplotlib", "setup"),
+    "boxstyle": ("matplotlib", "boxstyle"),
+    "theme": ("matplotlib", "theme"),
+    "smart_ticks": ("matplotlib_tweaks", "smart_ticks"),
+    "line_labels": ("matplotlib_tweaks", "line_labels"),
+    "ylabel_top": ("matplotlib_tweaks", "ylabel_top"),
+    "smooth_straight_lines": ("smoothing", "smooth_straight_lines"),
+    "smooth_noisy_lines": ("smoothing", "smooth_noisy_lines"),
+    "scatter_labels": ("_scatter_label", "scatter_labels"),
+    "render_cache_info": ("render_cache", "cache_info"),
+    "vega_setup": ("vega", "setup"),
+    "vega_rho_light": ("vega", "RHO_LIGHT"),
+    "vega_rho_dark": ("vega", "RHO_DARK"),
+    "bokeh_setup": ("bokeh", "setup"),
+    "bokeh_rho_light": ("bokeh", "rho_light"),
+    "bokeh_rho_dark": ("bokeh", "rho_dark"),
+    "ThemedPanel": ("panel", "ThemedPanel"),
+    "datagrid": ("panel", "datagrid"),
+    "show_json": ("panel", "show_json"),
+    "panel_setup": ("panel", "pn_setup"),
+    "plotly_setup": ("plotly", "setup"),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module, attr = _LAZY[name]
+        try:
+            value = getattr(import_module("." + module, __name__), attr)
+        except ModuleNotFoundError as e:
+            # keeps hasattr(rho_plus, 'plotly_setup') working without plotly installed
+            raise AttributeError(
+                f"module {__name__!r} has no attribute {name!r}: it needs {e.name}"
+            ) from e
+        globals()[name] = value
+        return value
+
+    # palettes are created lazily, so they can't be star-imported
+    from . import sequential_palettes
+
+    try:
+        return getattr(sequential_palettes, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__():
+    from . import sequential_palettes
+
+    return sorted(set(globals()) | set(_LAZY) | set(dir(sequential_palettes)))
@@ -3,24 +3,21 @@
 
 import numpy as np
 import textwrap
+import weakref
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
-from functools import lru_cache
-
 from rho_plus.color_util import contrast_with, to_rgb_arr
+from rho_plus.render_cache import RENDER_CACHE, data_transform, text_extents
 
 
 def compute_bbox(text, ax, **kwargs) -> mpl.transforms.Bbox:
     """
-    Compute the bounding box without forcing a draw.
-
-    Will error unless ax.figure.draw() has been called.
+    Compute the bounding box of text at the center of the axes without drawing it.
     """
-    t = ax.text(0.5, 0.5, text, transform=ax.transAxes, **kwargs)
-    bb = t.get_window_extent()
-    t.remove()
-    return bb
+    width, height = text_extents(ax.figure, [text], **kwargs)[0]
+    x, y = ax.transAxes.transform((0.5, 0.5))
+    return mpl.transforms.Bbox.from_bounds(x, y, width, height)
 
 
 def draw_bbox(bbox, ax):
@@ -38,41 +35,57 @@ def in_bbox(pts, bbox):
     )
 
 
-def intersects(pts, xc, yc, ww, hh):
-    xx = np.array(xc).reshape(-1, 1)
-    yy = np.array(yc).reshape(-1, 1)
-
-    xmin, xmax = xx - ww / 2, xx + ww / 2
-    ymin, ymax = yy - hh / 2, yy + hh / 2
-
-    return np.any(
-        (pts[:, 0] >= xmin)
-        & (pts[:, 0] <= xmax)
-        & (pts[:, 1] >= ymin)
-        & (pts[:, 1] <= ymax),
-        axis=1,
-    ).flatten()
-
-
-@lru_cache(None)
-def get_pts(ax):
-    out = ax.figure.canvas.buffer_rgba().tolist()
-
-    bgcolor = np.array(mpl.colors.to_rgba(plt.rcParams["figure.facecolor"])) * 255
-
-    mask = np.not_equal(out, bgcolor).any(axis=2)
-    # plt.imshow(mask)
-
-    ii, jj = np.vstack(np.nonzero(mask))
-    img_h, img_w = mask.shape
-    # convert from image coordinates to (x, y)
-    pts = np.vstack([jj, img_h - 1 - ii]).T
+class Occupancy:
+    """Which pixels of the rendered figure around an axes have something drawn on them, as a
+    summed-area table, so counting the drawn pixels in any box takes four lookups."""
+
+    def __init__(self, mask, x0: int, y0: int):
+        # mask[y, x] is the pixel at (x0 + x, y0 + y) in display coordinates
+        self.x0, self.y0 = x0, y0
+        self.height, self.width = mask.shape
+        self.table = np.zeros((self.height + 1, self.width + 1), dtype=np.int32)
+        np.cumsum(np.cumsum(mask, axis=0, dtype=np.int32), axis=1, out=self.table[1:, 1:])
+
+    def counts(self, xc, yc, ww, hh) -> np.ndarray:
+        """The number of drawn pixels in each box with the given centers and size, edges
+        included."""
+        xc = np.asarray(xc, dtype=np.float64)
+        yc = np.asarray(yc, dtype=np.float64)
+        x_lo = np.clip(np.ceil(xc - ww / 2) - self.x0, 0, self.width).astype(np.intp)
+        x_hi = np.clip(np.floor(xc + ww / 2) - self.x0 + 1, 0, self.width).astype(np.intp)
+        y_lo = np.clip(np.ceil(yc - hh / 2) - self.y0, 0, self.height).astype(np.intp)
+        y_hi = np.clip(np.floor(yc + hh / 2) - self.y0 + 1, 0, self.height).astype(np.intp)
+        x_hi = np.maximum(x_hi, x_lo)
+        y_hi = np.maximum(y_hi, y_lo)
+        t = self.table
+        return t[y_hi, x_hi] - t[y_lo, x_hi] - t[y_hi, x_lo] + t[y_lo, x_lo]
+
+    def intersects(self, xc, yc, ww, hh) -> np.ndarray:
+        """Whether each box with the given centers and size has anything drawn in it."""
+        return self.counts(xc, yc, ww, hh).reshape(-1) > 0
+
+
+def get_occupancy(ax) -> Occupancy:
+    """The occupancy of the last render of the figure, within the axes, cached until the figure
+    is drawn again."""
+    return RENDER_CACHE.get(ax.figure, ("occupancy", weakref.ref(ax)), lambda: _occupancy(ax))
+
+
+def _occupancy(ax) -> Occupancy:
+    # a view of the canvas, as one 32-bit integer per RGBA pixel
+    buffer = np.asarray(ax.figure.canvas.buffer_rgba())
+    pixels = buffer.view(np.uint32)[..., 0]
+    bgcolor = np.round(np.array(mpl.colors.to_rgba(plt.rcParams["figure.facecolor"])) * 255)
+    background = bgcolor.astype(np.uint8).view(np.uint32)[0]
 
     # pad to make sure that the x and y axes are included
     ax_bb = ax.patch.get_extents().padded(3)
-
-    # only consider points within the axis bounds
-    return pts[in_bbox(pts, ax_bb)]
+    img_h, img_w = pixels.shape
+    x0, x1 = max(int(np.ceil(ax_bb.xmin)), 0), min(int(np.floor(ax_bb.xmax)) + 1, img_w)
+    y0, y1 = max(int(np.ceil(ax_bb.ymin)), 0), min(int(np.floor(ax_bb.ymax)) + 1, img_h)
+    # image rows go down, display y goes up
+    window = pixels[::-1][y0:max(y1, y0), x0:max(x1, x0)]
+    return Occupancy(window != background, x0, y0)
 
 
 def compute_possible_locs(ax_bb, ND=20):
@@ -87,7 +100,7 @@ def compute_possible_locs(ax_bb, ND=20):
     return (xx.flatten(), yy.flatten())
 
 
-def compute_valid_locs(bb, ax_bb, pts, ND=20, other_bboxes=()):
+def compute_valid_locs(bb, ax_bb, occupancy, ND=20, other_bboxes=()):
     xx, yy = compute_possible_locs(ax_bb, ND=ND)
 
     xy = np.vstack([xx, yy]).T
@@ -101,7 +114,7 @@ def compute_valid_locs(bb, ax_bb, pts, ND=20, other_bboxes=()):
 
     xx, yy = xy.T
 
-    valid = ~intersects(pts, xx, yy, bb.width, bb.height)
+    valid = ~occupancy.intersects(xx, yy, bb.width, bb.height)
     valid_xx = xx[valid].flatten()
     valid_yy = yy[valid].flatten()
     return np.vstack([valid_xx, valid_yy]).T
@@ -115,8 +128,8 @@ def sq_mahalanobis_dist(xy, mu, sigma):
     return sq_dist
 
 
-def best_loc(bb, ax_bb, pts, x, y, data_xy_fig, dpi, nd=40, other_bboxes=()):
-    locs = compute_valid_locs(bb, ax_bb, pts, nd, other_bboxes)
+def best_loc(bb, ax_bb, occupancy, x, y, data_xy_fig, dpi, nd=40, other_bboxes=()):
+    locs = compute_valid_locs(bb, ax_bb, occupancy, nd, other_bboxes)
 
     if len(locs) == 0:
         # no valid placement
@@ -149,7 +162,7 @@ def scatter_labels(
     if ax is None:
         ax = plt.gca()
 
-    # set the renderer so each call to compute_bbox doesn't have to
+    # render what's already there, so labels can avoid it
     ax.figure.canvas.draw()
 
     dpi = ax.figure.get_dpi()
@@ -174,12 +187,22 @@ def scatter_labels(
     data_z = data_xy
     dists = sq_mahalanobis_dist(data_z, data_xy.mean(axis=0), np.cov(*data_xy.T))
 
-    xy_fig = ax.transData.transform(data_xy)
+    trans_data = data_transform(ax)
+    xy_fig = trans_data.transform(data_xy)
 
     ax_bb = ax.patch.get_extents()
 
     max_annot_dist_fig = MAX_ANNOT_DIST * ax.figure.get_dpi()
 
+    # measure every label at every wrap width at once
+    wrapped = [
+        ["\n".join(textwrap.wrap(label, width=width)) for width in (1000, 30, 15)]
+        for label in labels
+    ]
+    sizes = text_extents(ax.figure, [text for texts in wrapped for text in texts], **kwargs)
+    sizes = sizes.reshape(len(labels), -1, 2)
+    ax_center = ax.transAxes.transform((0.5, 0.5))
+
     # start from the outside and work inwards
     label_texts = []
     label_xy = []
@@ -189,11 +212,10 @@ def scatter_labels(
     label_colors = []
 
     for i in np.argsort(dists)[::-1]:
-        for width in (1000, 30, 15):
-            label = "\n".join(textwrap.wrap(labels[i], width=width))
+        for label, size in zip(wrapped[i], sizes[i]):
             x = data_x[i]
             y = data_y[i]
-            bb = compute_bbox(label, ax, **kwargs).padded(dpi * 2 / 72)
+            bb = mpl.transforms.Bbox.from_bounds(*ax_center, *size).padded(dpi * 2 / 72)
             data_bbox = mpl.transforms.Bbox.from_bounds(
                 *xy_fig[i] - max_annot_dist_fig / 2,
                 max_annot_dist_fig,
@@ -207,12 +229,11 @@ def scatter_labels(
             # print(data_bbox)
             # draw_bbox(data_bbox, ax)
 
-            # loc_fig = closest_loc(bb, data_bbox, get_pts(ax), *ax.transData.transform([x, y]), 4, bboxes)
             loc_fig = best_loc(
                 bb,
                 data_bbox,
-                get_pts(ax),
-                *ax.transData.transform([x, y]),
+                get_occupancy(ax),
+                *trans_data.transform([x, y]),
                 xy_fig,
                 dpi,
                 6,
@@ -221,7 +242,7 @@ def scatter_labels(
             if loc_fig is not None:
                 annot_dist = np.sqrt(np.sum(np.square(xy_fig[i] - loc_fig))) / dpi
 
-                loc_data = ax.transData.inverted().transform(loc_fig)
+                loc_data = trans_data.inverted().transform(loc_fig)
                 # place at best location
                 label_texts.append(label)
                 label_xy.append((x, y))
@@ -1,7 +1,9 @@
 import numpy as np
 import matplotlib as mpl
-import scipy.interpolate as interp
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.resources import files
 
 def srgb2lin(x):
     x = np.array(x)
@@ -40,7 +42,7 @@ srgb_m1 = np.array([
 
 srgb_minv = np.array([
     [3.2406, -1.5372, -0.4986],
-    [-0.9689, 1.8578, 0.0415],
+    [-0.9689, 1.8758, 0.0415],
     [0.0557, -0.204, 1.057]
 ])
 
@@ -73,10 +75,13 @@ def lab2lrgb(lab):
     lms = (lab_lms_m @ labs) ** 3
     return (lms_rgb_m @ lms).T
 
+rgb_lms_m = np.linalg.inv(lms_rgb_m)
+lms_lab_m = np.linalg.inv(lab_lms_m)
+
 def lrgb2lab(lrgb):
-    lrgb = np.array(lrgb).reshape(-1, 3).T
-    lms = np.cbrt(np.linalg.inv(lms_rgb_m) @ lrgb)
-    return (np.linalg.inv(lab_lms_m) @ lms).T
+    lrgb = np.asarray(lrgb).reshape(-1, 3).T
+    lms = np.cbrt(rgb_lms_m @ lrgb)
+    return (lms_lab_m @ lms).T
 
 def lrgb2srgb(rgb):
     return lin2srgb(rgb)
@@ -87,15 +92,143 @@ def lch2lrgb(lch):
 def lrgb2lch(lrgb):
     return lab2lch(lrgb2lab(lrgb))
 
-def lch2rgb(lch):
-    return lrgb2srgb(lch2lrgb(lch))
 
-def rgb2lch(rgb):
-    return lrgb2lch(srgb2lin(rgb))
+# Number of colors the fused kernels convert at a time: this bounds their scratch memory.
+BLOCK_SIZE = 1 << 16
+
+
+def _flat_out(arr, out, dtype):
+    """Sets up the output of the fused kernels: returns (out, out reshaped to (N, 3), dtype)."""
+    n = arr.shape[0]
+    if out is None:
+        if dtype is None:
+            dtype = np.float32 if arr.dtype == np.float32 else np.float64
+        out = np.empty((n, 3), dtype=dtype)
+        return out, out, np.dtype(dtype)
+
+    flat = out.reshape(-1, 3)
+    if flat.shape[0] != n:
+        raise ValueError(f"out has {flat.shape[0]} colors, but the input has {n}")
+    if not np.shares_memory(flat, out):
+        raise ValueError("out must be reshapeable to (N, 3) without copying")
+    if dtype is None:
+        dtype = out.dtype if out.dtype.kind == "f" else np.float64
+    return out, flat, np.dtype(dtype)
+
+
+def rgb2lch(rgb, out=None, dtype=None, block_size=BLOCK_SIZE):
+    """Converts sRGB to Oklch, returning an (N, 3) array (or out, if given).
+
+    The conversion is fused and done block_size colors at a time, so the only full-size
+    allocation is the output. Unsigned integer inputs are scaled from 0 to their maximum (e.g.,
+    255 for uint8). dtype is the precision to compute in, by default float32 for float32 inputs and
+    float64 otherwise. out can be any array that reshapes to (N, 3) without copying, like the
+    first three channels of an HxWx4 image."""
+    rgb = np.asarray(rgb)
+    flat_in = rgb.reshape(-1, 3)
+    out, flat_out, dtype = _flat_out(flat_in, out, dtype)
+    # only unsigned arrays are image data: signed ints, like Python ints, are 0-1 values
+    scale = 1 / np.iinfo(rgb.dtype).max if rgb.dtype.kind == "u" else None
+
+    rgb_lms = rgb_lms_m.T.astype(dtype)
+    lms_lab = lms_lab_m.T.astype(dtype)
+    m = min(block_size, len(flat_in))
+    buf = np.empty((m, 3), dtype=dtype)
+    buf2 = np.empty((m, 3), dtype=dtype)
+    mask = np.empty((m, 3), dtype=bool)
+
+    for start in range(0, len(flat_in), block_size):
+        block = flat_in[start:start + block_size]
+        k = len(block)
+        x, y, low = buf[:k], buf2[:k], mask[:k]
+        np.copyto(x, block, casting="unsafe")
+        if scale is not None:
+            x *= scale
+
+        # sRGB to linear
+        np.less_equal(x, 0.04045, out=low)
+        np.divide(x, 12.92, out=y)
+        x += 0.055
+        x /= 1.055
+        with np.errstate(invalid="ignore"):
+            np.power(x, 2.4, out=x)
+        np.copyto(x, y, where=low)
+
+        # linear to Oklab
+        np.matmul(x, rgb_lms, out=y)
+        np.cbrt(y, out=y)
+        np.matmul(y, lms_lab, out=x)
+
+        # Oklab to Oklch
+        o = flat_out[start:start + k]
+        o[:, 0] = x[:, 0]
+        np.hypot(x[:, 1], x[:, 2], out=o[:, 1])
+        np.arctan2(x[:, 2], x[:, 1], out=o[:, 2])
+        np.rad2deg(o[:, 2], out=o[:, 2])
+        np.add(o[:, 2], 360, out=o[:, 2], where=o[:, 2] < 0)
+
+    return out
+
+
+def lch2rgb(lch, out=None, dtype=None, block_size=BLOCK_SIZE):
+    """Converts Oklch to sRGB, returning an (N, 3) array (or out, if given).
+
+    The inverse of rgb2lch, with the same blocking, dtype, and out semantics. Out-of-gamut
+    colors are not clipped, unless out has an integer dtype, in which case the result is
+    clipped, scaled to the full range of that dtype, and rounded."""
+    lch = np.asarray(lch)
+    flat_in = lch.reshape(-1, 3)
+    out, flat_out, dtype = _flat_out(flat_in, out, dtype)
+    scale = np.iinfo(flat_out.dtype).max if flat_out.dtype.kind in "ui" else None
+
+    lab_lms = lab_lms_m.T.astype(dtype)
+    lms_rgb = lms_rgb_m.T.astype(dtype)
+    m = min(block_size, len(flat_in))
+    buf = np.empty((m, 3), dtype=dtype)
+    buf2 = np.empty((m, 3), dtype=dtype)
+    mask = np.empty((m, 3), dtype=bool)
+
+    for start in range(0, len(flat_in), block_size):
+        block = flat_in[start:start + block_size]
+        k = len(block)
+        x, y, low = buf[:k], buf2[:k], mask[:k]
+
+        # Oklch to Oklab
+        x[:, 0] = block[:, 0]
+        np.deg2rad(block[:, 2], out=y[:, 0])
+        np.cos(y[:, 0], out=x[:, 1])
+        np.sin(y[:, 0], out=x[:, 2])
+        x[:, 1] *= block[:, 1]
+        x[:, 2] *= block[:, 1]
+
+        # Oklab to linear
+        np.matmul(x, lab_lms, out=y)
+        np.power(y, 3, out=y)
+        np.matmul(y, lms_rgb, out=x)
+
+        # linear to sRGB
+        np.less_equal(x, 0.0031308, out=low)
+        np.multiply(x, 12.92, out=y)
+        with np.errstate(invalid="ignore"):
+            np.power(x, 1 / 2.4, out=x)
+        x *= 1.055
+        x -= 0.055
+        np.copyto(x, y, where=low)
+
+        o = flat_out[start:start + k]
+        if scale is None:
+            np.copyto(o, x, casting="same_kind")
+        else:
+            np.clip(x, 0, 1, out=x)
+            x *= scale
+            np.rint(x, out=x)
+            np.copyto(o, x, casting="unsafe")
+
+    return out
 
 def to_rgb(c):
     """Converts any matplotlib color to RGB."""
-    return np.array(mpl.colors.to_rgb(c))
+    return np.array(_to_rgb_memo(c))
 
 def to_hsluv(rgb):
     return np.array(hsluv.rgb_to_hsluv(rgb))
@@ -108,6 +241,8 @@ def color_is_dark(c):
     return lightness(c) <= 0.5
 
 def _max_c_inner(l, h, tol=0, n=10):
+    import scipy.interpolate as interp
+
     if l == 1 or l == 0:
         return 0
 
@@ -136,9 +271,157 @@ def _max_c_inner(l, h, tol=0, n=10):
     return np.min(limits)
 
 
-def max_c(l, h, **kwargs):
-    ll, hh = np.broadcast_arrays(l, h)
-    return np.array([_max_c_inner(l, h, **kwargs) for l, h in zip(ll.flatten(), hh.flatten())]).reshape(ll.shape)
+def _cubic_roots(a, b, c, d):
+    """Real roots of a * x^3 + b * x^2 + c * x + d, vectorized over arrays of coefficients.
+
+    Returns an array with a trailing axis of length 3. Complex roots are NaN."""
+    a, b, c, d = np.broadcast_arrays(*[np.asarray(x, dtype=np.float64) for x in (a, b, c, d)])
+    # a vanishing leading coefficient just sends one root off to infinity, which the callers
+    # never care about: nudge it so the closed form stays defined
+    a = np.where(np.abs(a) < 1e-12, 1e-12, a)
+    b, c, d = b / a, c / a, d / a
+
+    # depressed cubic t^3 + pt + q, x = t - b / 3
+    p = c - b ** 2 / 3
+    q = 2 * b ** 3 / 27 - b * c / 3 + d
+    sqrt_disc = np.sqrt((q / 2) ** 2 + (p / 3) ** 3 + 0j)
+    # pick the sign that avoids cancellation
+    w = np.where(np.abs(-q / 2 + sqrt_disc) >= np.abs(-q / 2 - sqrt_disc), -q / 2 + sqrt_disc, -q / 2 - sqrt_disc)
+    u = w ** (1 / 3)
+
+    omega = np.exp(2j * np.pi / 3 * np.arange(3))
+    uk = u[..., None] * omega
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tk = np.where(uk == 0, 0, uk - p[..., None] / (3 * uk))
+    roots = tk - b[..., None] / 3
+
+    real = roots.real
+    # polish with Newton's method: the closed form loses precision for near-degenerate cubics
+    bb, cc, dd = b[..., None], c[..., None], d[..., None]
+    for _ in range(2):
+        f = ((real + bb) * real + cc) * real + dd
+        df = (3 * real + 2 * bb) * real + cc
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(df != 0, f / df, 0)
+        real = real - step
+
+    is_real = np.abs(roots.imag) <= 1e-7 * (1 + np.abs(roots.real))
+    return np.where(is_real, real, np.nan)
+
+
+def _max_c_exact(l, h, tol=0, c_max=0.37):
+    """Maximum Oklch chroma that stays within the sRGB gamut for the given lightness and hue.
+
+    Vectorized over any broadcastable arrays of l and h. Each linear RGB channel is a cubic in
+    chroma for fixed lightness and hue, so the gamut boundary is the first chroma at which one of
+    those cubics leaves [tol, 1 - tol], found in closed form. Results are capped at c_max.
+
+    This is exact up to floating-point error. The spline approximation it replaces
+    (_max_c_inner) could be off by up to 0.03, so results differ from it by at most that much."""
+    ll, hh = np.broadcast_arrays(np.asarray(l, dtype=np.float64), np.asarray(h, dtype=np.float64))
+    # NaN or infinite inputs give NaN, and are solved as 0 so they don't warn
+    finite = np.isfinite(ll) & np.isfinite(hh)
+    ll, hh = np.where(finite, ll, 0), np.where(finite, hh, 0)
+    hue = np.deg2rad(hh)
+
+    # l' m' s' = l + c * s_i for the hue direction s_i
+    s = np.cos(hue)[..., None] * lab_lms_m[:, 1] + np.sin(hue)[..., None] * lab_lms_m[:, 2]
+    lc = ll[..., None]
+
+    # rgb_j(c) = sum_i M_ji (l + c s_i)^3 = k3 c^3 + k2 c^2 + k1 c + k0
+    k3 = (s ** 3) @ lms_rgb_m.T
+    k2 = 3 * lc * (s ** 2) @ lms_rgb_m.T
+    k1 = 3 * lc ** 2 * s @ lms_rgb_m.T
+    k0 = lc ** 3 * lms_rgb_m.sum(axis=1)
+
+    limit = np.full(ll.shape, float(c_max))
+    for target, sign in ((tol, -1), (1 - tol, 1)):
+        roots = _cubic_roots(k3, k2, k1, k0 - target)
+        # only count roots where the channel is actually leaving the gamut
+        slope = (3 * k3[..., None] * roots + 2 * k2[..., None]) * roots + k1[..., None]
+        exits = (roots > 0) & (sign * slope > 0)
+        first = np.where(exits, roots, np.inf).min(axis=(-2, -1))
+        limit = np.minimum(limit, first)
+
+    return np.where(finite, np.where((ll <= 0) | (ll >= 1), 0.0, limit), np.nan)
+
+
+# If False, max_c interpolates the lookup table by default instead of solving exactly.
+EXACT_GAMUT = True
+
+# Lookup table of _max_c_exact over an evenly-spaced grid of lightness (rows, including both ends)
+# and hue (columns, in degrees, not including 360). Stored as uint16 fractions of GAMUT_LUT_C_MAX.
+GAMUT_LUT_FILE = "gamut_lut.npy"
+GAMUT_LUT_SHAPE = (257, 360)
+GAMUT_LUT_C_MAX = 0.37
+
+
+def build_gamut_lut(shape=GAMUT_LUT_SHAPE):
+    """Computes the maximum chroma lookup table used by max_c, quantized to uint16."""
+    n_l, n_h = shape
+    ll = np.linspace(0, 1, n_l)
+    hh = np.arange(n_h) * 360 / n_h
+    cc = _max_c_exact(ll[:, None], hh[None, :], c_max=GAMUT_LUT_C_MAX)
+    return np.round(cc / GAMUT_LUT_C_MAX * np.iinfo(np.uint16).max).astype(np.uint16)
+
+
+@lru_cache(None)
+def _gamut_lut():
+    """Loads the lookup table shipped in rho_plus/data, building it in memory if it's missing."""
+    try:
+        with files("rho_plus.data").joinpath(GAMUT_LUT_FILE).open("rb") as f:
+            lut = np.load(f)
+    except (OSError, ValueError):
+        lut = build_gamut_lut()
+
+    return lut.astype(np.float64) * (GAMUT_LUT_C_MAX / np.iinfo(np.uint16).max)
+
+
+def _max_c_lut(l, h):
+    """Bilinear interpolation into the gamut lookup table."""
+    lut = _gamut_lut()
+    n_l, n_h = lut.shape
+    ll, hh = np.broadcast_arrays(np.asarray(l, dtype=np.float64), np.asarray(h, dtype=np.float64))
+    finite = np.isfinite(ll) & np.isfinite(hh)
+    ll, hh = np.where(finite, ll, 0), np.where(finite, hh, 0)
+
+    fl = np.clip(ll, 0, 1) * (n_l - 1)
+    i = np.minimum(fl.astype(np.intp), n_l - 2)
+    wl = fl - i
+
+    fh = (hh % 360) * (n_h / 360)
+    j = fh.astype(np.intp)
+    wh = fh - j
+    j %= n_h
+    j2 = (j + 1) % n_h
+
+    # gather from the flattened table: much faster than 2D fancy indexing
+    flat = lut.ravel()
+    i *= n_h
+    lo = flat.take(i + j) * (1 - wh) + flat.take(i + j2) * wh
+    i += n_h
+    hi = flat.take(i + j) * (1 - wh) + flat.take(i + j2) * wh
+    out = lo * (1 - wl) + hi * wl
+    return np.where(finite, np.where((ll <= 0) | (ll >= 1), 0.0, out), np.nan)
+
+
+def max_c(l, h, tol=0, c_max=0.37, exact=None):
+    """Maximum Oklch chroma that stays within the sRGB gamut for the given lightness and hue.
+    Vectorized over any broadcastable arrays of l and h, and capped at c_max.
+
+    By default, this solves exactly. exact=False, or setting EXACT_GAMUT to False, interpolates
+    a precomputed table (see build_gamut_lut) instead, which is faster for large arrays but
+    approximate: against the exact solver, 99% of random (l, h) queries are within 5e-4, but
+    near the sharp corners of the gamut it can be off by 0.04, in either direction, so colors
+    at the interpolated maximum can be slightly out of gamut. The table is only used when tol
+    is 0."""
+    if exact is None:
+        exact = EXACT_GAMUT
+
+    if exact or tol != 0 or c_max > GAMUT_LUT_C_MAX:
+        return _max_c_exact(l, h, tol=tol, c_max=c_max)
+    else:
+        return np.minimum(_max_c_lut(l, h), c_max)
 
 
 def lightness_with_ratio(l_bg, l_c=75):
@@ -152,29 +435,134 @@ def lightness_with_ratio(l_bg, l_c=75):
             ((l_bg * 100) ** phi - 2 ** (-phi / 2) * (l_c + 35) ** phi) ** (1 / phi),
         ) / 100
 
+# value of each ASCII hex digit, -1 for anything else
+_HEX_DIGITS = np.full(128, -1, dtype=np.int16)
+for _i, _c in enumerate("0123456789abcdef"):
+    _HEX_DIGITS[ord(_c)] = _i
+    _HEX_DIGITS[ord(_c.upper())] = _i
+del _i, _c
+
+
+@lru_cache(1024)
+def _to_rgb_cached(c):
+    return mpl.colors.to_rgb(c)
+
+
+def _to_rgb_memo(c):
+    """mpl.colors.to_rgb, memoized for everything but colors from the property cycle."""
+    if isinstance(c, str) and not (c[:1] == "C" and c[1:].isdigit()):
+        return _to_rgb_cached(c)
+    else:
+        return mpl.colors.to_rgb(c)
+
+
+def _parse_hex_arr(strs):
+    """Parses a 1D array of strings, returning an (N, 3) array of RGB with NaN rows for
+    anything that isn't a #rgb, #rgba, #rrggbb, or #rrggbbaa hex code."""
+    n = len(strs)
+    # each character of a unicode array is a UCS4 code point, so this is zero-copy
+    codes = strs.view(np.uint32).reshape(n, -1)
+    lengths = np.count_nonzero(codes, axis=1)
+    if codes.shape[1] < 4:
+        return np.full((n, 3), np.nan)
+
+    digits = _HEX_DIGITS[np.minimum(codes[:, 1:], 127)].astype(np.float64)
+    # code points past ASCII would otherwise alias to DEL
+    digits[codes[:, 1:] >= 128] = -1
+
+    out = np.full((n, 3), np.nan)
+    is_hash = codes[:, 0] == ord("#")
+    for length, n_digits in ((7, 2), (9, 2), (4, 1), (5, 1)):
+        if codes.shape[1] < length:
+            continue
+        rows = is_hash & (lengths == length)
+        rgb_digits = digits[rows, : 3 * n_digits].reshape(-1, 3, n_digits)
+        if length in (9, 5):
+            # still need to validate the alpha digits
+            valid = (digits[rows, : length - 1] >= 0).all(axis=1)
+        else:
+            valid = (rgb_digits >= 0).all(axis=(1, 2))
+        if n_digits == 2:
+            vals = (rgb_digits[..., 0] * 16 + rgb_digits[..., 1]) / 255
+        else:
+            vals = rgb_digits[..., 0] * 17 / 255
+        vals[~valid] = np.nan
+        out[rows] = vals
+
+    return out
+
+
 def to_rgb_arr(colors):
+    """Converts a color or array of colors to RGB. A single color returns shape (3,), and
+    anything else returns shape (N, 3).
+
+    Float RGB/RGBA arrays are returned as views without copying. Hex codes are parsed in bulk,
+    and only other colors (named colors, grays, etc.) go through Matplotlib, with a memo table."""
     if isinstance(colors, str):
-        return to_rgb(colors)
-    elif len(np.array(colors).shape) == 1 and len(np.array(colors)) > 1:
-        return to_rgb(colors)
+        return np.array(_to_rgb_memo(colors))
+
+    try:
+        arr = np.asarray(colors)
+    except ValueError:
+        # ragged mix of names and tuples
+        return np.array([_to_rgb_memo(c) for c in colors]).reshape(-1, 3)
+
+    if arr.dtype.kind in "fiu":
+        if arr.ndim == 1 and arr.shape[0] in (3, 4):
+            arr = arr[:3]
+        elif arr.ndim == 2 and arr.shape[1] in (3, 4):
+            arr = arr[:, :3]
+        else:
+            raise ValueError(f"Can't interpret array of shape {arr.shape} as RGB/RGBA colors")
+
+        if arr.size and (arr.min() < 0 or arr.max() > 1):
+            raise ValueError("RGB/RGBA values should be within 0-1 range")
+        # e.g., (1, 0, 0) is still 0-1 RGB
+        return arr if arr.dtype.kind == "f" else arr.astype(np.float64)
+
+    flat = arr.reshape(-1)
+    if arr.dtype.kind == "U" and len(flat):
+        out = _parse_hex_arr(flat)
+        missing = np.isnan(out[:, 0])
     else:
-        return np.array([to_rgb(color) for color in np.array(colors)]).reshape(-1, 3)
+        out = np.empty((len(flat), 3))
+        missing = np.ones(len(flat), dtype=bool)
+
+    for i in np.nonzero(missing)[0]:
+        out[i] = _to_rgb_memo(flat[i])
+
+    return out
+
+
+_HEX_CHARS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def to_hex_arr(rgb):
+    """Converts an (N, 3) or (N, 4) array of RGB in [0, 1] to an array of #rrggbb strings,
+    rounding like mpl.colors.to_hex."""
+    rgb = np.asarray(rgb).reshape(-1, np.shape(rgb)[-1])[:, :3]
+    ints = np.rint(np.clip(rgb, 0, 1) * 255).astype(np.uint8)
+    chars = np.empty((len(ints), 7), dtype=np.uint8)
+    chars[:, 0] = ord("#")
+    chars[:, 1::2] = _HEX_CHARS[ints >> 4]
+    chars[:, 2::2] = _HEX_CHARS[ints & 15]
+    return chars.view("S7").ravel().astype(str)
+
 
 def lightness(colors):
     return rgb2lch(to_rgb_arr(colors))[:, 0]
 
 def contrast_l(colors, l_c=75):
-    return lightness_with_ratio(lightness(to_rgb_arr(colors)), l_c)
+    return lightness_with_ratio(lightness(colors), l_c)
 
-def contrast_with(fg, bg, l_c=75):
+def contrast_with(fg, bg, l_c=75, exact=None):
     fgs = to_rgb_arr(fg)
     bgs = to_rgb_arr(bg)
     bg_ls = lightness(bgs)
 
     fg_lch = rgb2lch(fgs)
-    old_max_c = max_c(*fg_lch[:, [0, 2]].T)
     old_l = fg_lch[:, 0]
-    new_l = contrast_l(bg, l_c)
+    new_l = lightness_with_ratio(bg_ls, l_c)
     # print(old_l, new_l, bg_ls)
     fg_lch[:, 0] = np.where(
         # if background is dark, keep light elements unchanged
@@ -183,8 +571,66 @@ def contrast_with(fg, bg, l_c=75):
         np.maximum(old_l, new_l),
         np.minimum(old_l, new_l)
     ).clip(0, 1)
-    fg_lch[:, 1] = np.clip(fg_lch[:, 1], 0, max_c(*fg_lch[:, [0, 2]].T))
-    # fg_lch[:, 1] = fg_lch[:, 1] / old_max_c * max_c(*fg_lch[:, [0, 2]].T)
+    fg_lch[:, 1] = np.clip(fg_lch[:, 1], 0, max_c(*fg_lch[:, [0, 2]].T, exact=exact))
 
     rgb = lch2rgb(fg_lch).clip(0, 1).reshape(np.broadcast_shapes(fgs.shape, bgs.shape))
     return rgb
+
+
+def map_image_lch(img, func, out=None, tile_rows=64, max_workers=None):
+    """Applies func to the Oklch colors of an HxWx3 or HxWx4 image, e.g., from
+    np.asarray(fig.canvas.buffer_rgba()). Works with uint8 or float images.
+
+    func takes an (N, 3) float32 array of Oklch colors and modifies it in place. The image is
+    converted tile_rows rows at a time in a thread pool of max_workers threads (NumPy releases
+    the GIL, so this parallelizes), and written to out, which defaults to img itself. Alpha is
+    left alone. Returns out."""
+    img = np.asarray(img)
+    if img.ndim != 3 or img.shape[2] not in (3, 4):
+        raise ValueError(f"Expected an HxWx3 or HxWx4 image, got shape {img.shape}")
+
+    if out is None:
+        out = img
+    elif out is not img:
+        if out.shape != img.shape:
+            raise ValueError(f"out has shape {out.shape}, but the image has shape {img.shape}")
+        out[..., 3:] = img[..., 3:]
+
+    def process(start):
+        tile = img[start:start + tile_rows, :, :3]
+        lch = rgb2lch(tile, dtype=np.float32)
+        func(lch)
+        rgb = out[start:start + tile_rows, :, :3]
+        lch2rgb(lch, out=rgb)
+        if rgb.dtype.kind == "f":
+            np.clip(rgb, 0, 1, out=rgb)
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        # list() so any exceptions get raised here
+        list(pool.map(process, range(0, img.shape[0], tile_rows)))
+
+    return out
+
+
+def recolor_image(img, lightness=None, invert=False, clip_chroma=True, out=None, **kwargs):
+    """Recolors an image in Oklch space, in place by default. Kwargs are passed to map_image_lch.
+
+    If invert, swaps light and dark (L -> 1 - L) keeping hue, e.g., to turn a light-mode figure
+    into a dark-mode one. lightness then remaps L: either a function of L, or a tuple (lo, hi)
+    that linearly maps [0, 1] to [lo, hi]. If clip_chroma, chroma is clipped to the sRGB gamut
+    for the new lightness and hue, so colors keep their hue instead of clipping per channel."""
+    if isinstance(lightness, tuple):
+        lo, hi = lightness
+        lightness = lambda ll: lo + (hi - lo) * ll
+
+    def op(lch):
+        ll = lch[:, 0]
+        if invert:
+            np.subtract(1, ll, out=ll)
+        if lightness is not None:
+            ll[:] = lightness(ll)
+        np.clip(ll, 0, 1, out=ll)
+        if clip_chroma:
+            np.minimum(lch[:, 1], max_c(ll, lch[:, 2]), out=lch[:, 1])
+
+    return map_image_lch(img, op, out=out, **kwargs)
@@ -0,0 +1,115 @@
+"""Loads the Vega and Plotly themes compiled into rho_plus/data, so they don't have to be
+rebuilt on import.
+
+The compiled themes are written by scripts/write_vega_jsons.py and
+scripts/write_plotly_jsons.py, which also record a hash of everything that goes into them in
+theme_manifest.json, along with the version of the backend package whose defaults the themes
+inherit, if any. If the hash doesn't match at runtime, because the colors, palettes, or theme
+code changed, or that package has a different major or minor version, the themes are rebuilt
+instead. So are themes whose sources can't be read, e.g. in a zipped install."""
+
+from functools import lru_cache
+import hashlib
+from importlib.metadata import PackageNotFoundError, version
+from importlib.resources import files
+import json
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+MANIFEST_FILE = "theme_manifest.json"
+
+# the files each backend's themes are built from, besides the colors and palettes
+BACKEND_SOURCES = {
+    "vega": ("vega.py",),
+    "plotly": ("plotly.py",),
+}
+COMMON_SOURCES = (
+    "colors.py",
+    "color_util.py",
+    "palettes.py",
+    "sequential_palettes.py",
+    "theme_tokens.py",
+    "compiled_themes.py",
+    "data/sequential_palettes.npy",
+    "data/sequential_palettes_index.json",
+    "data/sequential_palettes.json",
+)
+# the package whose defaults a backend's themes inherit: Plotly templates build on plotly's own,
+# but the Vega themes are plain JSON that doesn't depend on altair
+BACKEND_PACKAGES = {"vega": None, "plotly": "plotly"}
+
+
+@lru_cache(maxsize=None)
+def backend_version(backend: str) -> str:
+    """The major and minor version of the package the backend's themes inherit from, or "" if
+    there isn't one or it isn't installed."""
+    package = BACKEND_PACKAGES[backend]
+    if package is None:
+        return ""
+    try:
+        return ".".join(version(package).split(".")[:2])
+    except PackageNotFoundError:
+        return ""
+
+
+@lru_cache(maxsize=None)
+def theme_hash(backend: str) -> Optional[str]:
+    """Hash of the sources and data a backend's themes are compiled from, or None if they can't
+    be read."""
+    package = files("rho_plus")
+    digest = hashlib.sha256()
+    try:
+        for source in COMMON_SOURCES + BACKEND_SOURCES[backend]:
+            digest.update(source.encode())
+            digest.update(package.joinpath(source).read_bytes())
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def read_manifest() -> Dict[str, Dict[str, str]]:
+    try:
+        with files("rho_plus.data").joinpath(MANIFEST_FILE).open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def is_fresh(backend: str) -> bool:
+    """Whether the compiled themes for the backend match the current sources and backend
+    version."""
+    current = theme_hash(backend)
+    compiled = read_manifest().get(backend)
+    return (
+        current is not None
+        and isinstance(compiled, dict)
+        and compiled.get("hash") == current
+        and compiled.get("version") == backend_version(backend)
+    )
+
+
+def load_theme(backend: str, name: str, build: Callable[[], dict]) -> dict:
+    """Returns the JSON for the compiled theme, or calls build to make it if it's stale or
+    missing."""
+    if is_fresh(backend):
+        try:
+            with files("rho_plus.data").joinpath(f"{backend}_{name}.json").open() as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return build()
+
+
+def write_themes(backend: str, themes: Dict[str, dict], data_dir: Path):
+    """Writes compiled themes as JSON to data_dir and records their hash in the manifest."""
+    current = theme_hash(backend)
+    if current is None:
+        raise OSError(f"Can't read the sources of the {backend} themes to hash them")
+    for name, theme in themes.items():
+        with open(data_dir / f"{backend}_{name}.json", "w") as f:
+            json.dump(theme, f, indent=2)
+
+    manifest_path = data_dir / MANIFEST_FILE
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    manifest[backend] = {"hash": current, "version": backend_version(backend)}
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
@@ -1,76 +1,22 @@
 #!/usr/bin/env python3
 """Matplotlib themes as dictionaries."""
 
-from typing import List, Tuple
+from contextlib import contextmanager
+import threading
+from typing import Dict, List, Tuple
+import matplotlib as mpl
+import matplotlib.colors as mpl_colors
 from .colors import LIGHT_COLORS, DARK_COLORS, LIGHT_SHADES, DARK_SHADES
+from .theme_tokens import MPL_BASE, mpl_theme, theme_tokens
 from .palettes import SequentialPalette
-from .sequential_palettes import setup_cmap_aliases, ALIASES
+from .sequential_palettes import ALIAS_ARRAYS, ALIASES, setup_cmap_aliases
 from .util import decorate_all
-from functools import wraps
-
-rho = {
-    # text sizes
-    "font.size": 12,
-    "axes.labelsize": "large",
-    "axes.titlesize": "x-large",
-    "figure.titlesize": "xx-large",
-    # text weights
-    "axes.titleweight": 400,
-    "figure.titleweight": 700,
-    # if grid is turned on, have it go below plots
-    "axes.axisbelow": "false",
-    "grid.linestyle": "-",
-    "grid.linewidth": 1.0,
-    # turn off grid by default
-    "axes.grid": "false",
-    # turn off ticks on axes
-    "xtick.major.size": 0,
-    "xtick.minor.size": 0,
-    "ytick.major.size": 0,
-    "ytick.minor.size": 0,
-    # sans-serif by default
-    "font.family": "sans-serif",
-    # use Computer Modern for LaTeX
-    "mathtext.fontset": "cm",
-    # turn off right and top spines
-    "axes.spines.right": "false",
-    "axes.spines.top": "false",
-    # set default figure size to a bit more than 6.4 x 4.8
-    "figure.figsize": (8, 6),
-    "lines.linewidth": 1.5,
-    "image.cmap": "rho_sequential",
-}
-
-
-rho_light = rho.copy()
-rho_dark = rho.copy()
-
-for rc, shades in [(rho_light, LIGHT_SHADES), (rho_dark, DARK_SHADES)]:
-    empty, lightest, light, medium, dark, darkest = [x[1:] for x in shades]
-    rc["figure.facecolor"] = empty
-    rc["savefig.facecolor"] = empty
-    rc["axes.facecolor"] = empty
-
-    rc["axes.edgecolor"] = light
-    rc["grid.color"] = light
-    rc["figure.edgecolor"] = light
-    rc["savefig.edgecolor"] = light
-    rc["legend.edgecolor"] = light
-    rc["boxplot.flierprops.color"] = light
-    rc["boxplot.boxprops.color"] = light
-    rc["boxplot.whiskerprops.color"] = light
-    rc["boxplot.capprops.color"] = light
-
-    rc["xtick.color"] = medium
-    rc["ytick.color"] = medium
-
-    rc["xtick.labelcolor"] = dark
-    rc["ytick.labelcolor"] = dark
-    rc["legend.labelcolor"] = dark
-
-    rc["text.color"] = darkest
-    rc["axes.labelcolor"] = darkest
-    rc["axes.titlecolor"] = darkest
+from functools import lru_cache, wraps
+
+rho = MPL_BASE
+
+rho_light = mpl_theme(theme_tokens(False))
+rho_dark = mpl_theme(theme_tokens(True))
 
 
 def boxstyle(is_dark=None) -> dict:
@@ -102,101 +48,244 @@ def boxstyle(is_dark=None) -> dict:
 
     return opts
 
+# https://github.com/ipython/ipykernel/issues/267
+
+# Setting %matplotlib inline erases some styles, so the full theme doesn't
+# take effect until you run the cell again. To fix this, if we're in IPython,
+# load that first, so those rcParams get overwritten. Loading matplotlib
+# with, e.g., plt.clf() also works, but it prints out the figure object, which
+# we don't want.
+
+# https://stackoverflow.com/questions/15411967/how-can-i-check-if-code-is-executed-in-the-ipython-notebook
+@lru_cache(maxsize=None)
+def in_notebook():
+    try:
+        from IPython import get_ipython
+
+        if "IPKernelApp" not in get_ipython().config:  # pragma: no cover
+            return False
+    except ImportError:
+        return False
+    except AttributeError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def rc_params(is_dark: bool) -> dict:
+    """The rcParams setup applies, computed once per color mode. Don't modify the result."""
+    theme = rho_dark if is_dark else rho_light
+    colors = DARK_COLORS if is_dark else LIGHT_COLORS
+    theme = theme.copy()
+    if "xtick.labelcolor" not in mpl.rcParams.keys():
+        # starting from matplotlib 3.4.0, you can set the label color differently from the ticks
+        # if that isn't available, instead we make the tick color darker so the labels are readable
+        theme["xtick.color"] = theme["xtick.labelcolor"]
+        theme["ytick.color"] = theme["ytick.labelcolor"]
+
+    # for other compatibility, like legend.labelcolor or axes.titlecolor, there's no adjustments
+    # we have to make, and we just delete the key
+    theme = {k: v for k, v in theme.items() if k in mpl.rcParams.keys()}
+
+    # this annoyingly requires a matplotlib object, so delay until
+    # we're confident that matplotlib is installed
+    theme["axes.prop_cycle"] = mpl.cycler(
+        # remove # from color beginning
+        color=[x[1:] for x in colors]
+    )
+    return theme
+
+
+# what previous setup calls have done, so repeated calls only do what changed
+_state = {"is_dark": None, "decorated": False, "cmaps": False, "inline": False}
+
+# Matplotlib 3.10 and later read and write rcParams only through these methods, so pointing them
+# at a per-thread copy gives each theme block its own rcParams
+_RC_METHODS = ("_get", "_set", "_update_raw")
+_PER_THREAD = all(hasattr(mpl.RcParams, name) for name in _RC_METHODS)
+# each thread's stack of rcParams copies, one per open theme block
+_thread_rc = threading.local()
+# how many theme blocks are open in all threads, so the methods are only redirected while needed
+_redirects = {"blocks": 0}
+_redirect_lock = threading.Lock()
+# without per-thread rcParams, theme blocks in different threads take turns
+_theme_lock = threading.RLock()
+_register_lock = threading.Lock()
+
+
+def _thread_rc_params():
+    stack = getattr(_thread_rc, "stack", None)
+    return stack[-1] if stack else None
+
+
+def _rc_get(key):
+    rc = _thread_rc_params()
+    # the backend is shared by every thread
+    if rc is None or key == "backend":
+        return dict.__getitem__(mpl.rcParams, key)
+    return rc[key]
+
+
+def _rc_set(key, val):
+    rc = _thread_rc_params()
+    if rc is None or key == "backend":
+        dict.__setitem__(mpl.rcParams, key, val)
+    else:
+        rc[key] = val
+
+
+def _rc_update_raw(other_params):
+    if isinstance(other_params, mpl.RcParams):
+        other_params = dict.items(other_params)
+    rc = _thread_rc_params()
+    if rc is None:
+        dict.update(mpl.rcParams, other_params)
+    else:
+        rc.update(other_params)
+
+
+@contextmanager
+def _own_rc_params():
+    """Gives the current thread its own copy of rcParams until the block ends."""
+    with _redirect_lock:
+        if _redirects["blocks"] == 0:
+            for name, method in zip(_RC_METHODS, (_rc_get, _rc_set, _rc_update_raw)):
+                setattr(mpl.rcParams, name, method)
+        _redirects["blocks"] += 1
+
+    stack = _thread_rc.__dict__.setdefault("stack", [])
+    stack.append(dict(stack[-1] if stack else dict.items(mpl.rcParams)))
+    try:
+        yield
+    finally:
+        stack.pop()
+        with _redirect_lock:
+            _redirects["blocks"] -= 1
+            if _redirects["blocks"] == 0:
+                for name in _RC_METHODS:
+                    delattr(mpl.rcParams, name)
+
+
+@lru_cache(maxsize=None)
+def _theme_cmaps(is_dark: bool) -> Dict[str, mpl_colors.Colormap]:
+    cmaps = {}
+    for alias in ALIASES:
+        palette = SequentialPalette('rho_' + alias, ALIAS_ARRAYS[is_dark][alias])
+        cmaps['rho_' + alias] = palette.as_mpl_cmap()
+        cmaps['rho_' + alias + '_r'] = palette.rev().as_mpl_cmap()
+    return cmaps
+
+
+def _mode_cmap_name(name: str, is_dark: bool) -> str:
+    """The name the mode's version of an alias colormap is registered under, e.g.,
+    rho_heatmap_dark_r for rho_heatmap_r."""
+    mode = '_dark' if is_dark else '_light'
+    return name[:-2] + mode + '_r' if name.endswith('_r') else name + mode
+
+
+def _register_mode_cmaps(is_dark: bool):
+    """Registers the mode's alias colormaps under names that don't change with the mode."""
+    with _register_lock:
+        for name, cmap in _theme_cmaps(is_dark).items():
+            mode_name = _mode_cmap_name(name, is_dark)
+            if mode_name not in mpl.colormaps:
+                mpl.colormaps.register(cmap, name=mode_name)
+
+
+@contextmanager
+def theme(is_dark: bool):
+    """Uses the light or dark theme within a block of code, yielding the theme, colors, and a
+    dict with the theme's rho_sequential, rho_diverging, and rho_heatmap colormaps (and their
+    reverses, with _r), which are new objects each time.
+
+    Unlike setup, this restores the previous rcParams afterwards, and it doesn't change what
+    the alias names refer to: "rho_heatmap" is still whichever colormap setup registered, so
+    pass the yielded colormaps instead. The default image colormap is the theme's, registered
+    under a name for its mode, like rho_sequential_light.
+
+    The theme only applies in the thread the block is in, so threads can render different
+    themes at once, and rcParams changes in the block, e.g. from rc_context, stay in that thread
+    and end with it. Blocks can be nested. Matplotlib before 3.10 doesn't read rcParams through
+    methods that can be redirected per thread, so there the theme is global while the block
+    is open, and blocks in different threads take turns."""
+    is_dark = bool(is_dark)
+    colors = DARK_COLORS if is_dark else LIGHT_COLORS
+    cmaps = {name: cmap.copy() for name, cmap in _theme_cmaps(is_dark).items()}
+    _register_mode_cmaps(is_dark)
+    rc = dict(rc_params(is_dark))
+    rc["image.cmap"] = _mode_cmap_name("rho_sequential", is_dark)
+    with (_own_rc_params() if _PER_THREAD else _theme_lock), mpl.rc_context(rc):
+        yield (rc, colors, cmaps)
+
+
+def _wrapped_boxplot(*args, **kwargs):
+    """Wraps sns.boxplot to work in both dark and light mode."""
+    import seaborn as sns
+
+    if 'fill' in kwargs and not kwargs['fill']:
+        # nothing we're changing affects the unfilled plot
+        return sns.boxplot(*args, **kwargs)
+
+    box_kwargs = boxstyle(_state["is_dark"])
+    box_kwargs.update(kwargs)
+    out = sns.boxplot(*args, **box_kwargs)
+    return out
+
+
 def setup(is_dark: bool, setup=True, wrap_for_eval=True) -> Tuple[dict, List[str]]:
     """Sets up Matplotlib according to the given color scheme and pyplot module. Returns the theme and colors as a tuple, setting the theme and colormaps.
 
     If wrap_for_eval, decorates plotting functions to accept expressions using columns instead of just column names
-    in e.g., plt.plot and plt.scatter. Has no effect if setup is False."""
-    theme = rho_dark if is_dark else rho_light
+    in e.g., plt.plot and plt.scatter. Has no effect if setup is False.
+
+    Everything that doesn't depend on the color mode is only done on the first call, so
+    switching back and forth between modes only updates rcParams and the alias colormaps. To
+    use a theme for a block of code without changing the settings after it, use theme instead."""
+    is_dark = bool(is_dark)
     colors = DARK_COLORS if is_dark else LIGHT_COLORS
     SEQUENTIAL = setup_cmap_aliases(is_dark)
-    if setup:
-        import matplotlib as mpl
+    if not setup:
+        return (rho_dark if is_dark else rho_light, colors)
+
+    if wrap_for_eval and not _state["decorated"]:
         import matplotlib.pyplot as plt
         import seaborn as sns
 
-        if wrap_for_eval:
-            decorate_all(plt)
-            decorate_all(mpl.axes.Axes)
-            decorate_all(sns)
-
-            @wraps(sns.boxplot)
-            def wrapped_boxplot(*args, **kwargs):
-                """Wraps sns.boxplot to work in both dark and light mode."""
-                if 'fill' in kwargs and not kwargs['fill']:
-                    # nothing we're changing affects the unfilled plot
-                    return sns.boxplot(*args, **kwargs)
-
-                box_kwargs = boxstyle(is_dark)
-                box_kwargs.update(kwargs)
-                out = sns.boxplot(*args, **box_kwargs)
-                return out
-
-            sns.rp_boxplot = wrapped_boxplot
-
-
-        if "xtick.labelcolor" not in plt.rcParams.keys():
-            # starting from matplotlib 3.4.0, you can set the label color differently from the ticks
-            # if that isn't available, instead we make the tick color darker so the labels are readable
-            theme["xtick.color"] = theme["xtick.labelcolor"]
-            theme["ytick.color"] = theme["ytick.labelcolor"]
-
-        # for other compatibility, like legend.labelcolor or axes.titlecolor, there's no adjustments
-        # we have to make, and we just delete the key
-        theme = {k: v for k, v in theme.items() if k in plt.rcParams.keys()}
-
-        # this annoyingly requires a matplotlib object, so delay until
-        # we're confident that matplotlib is installed
-        theme["axes.prop_cycle"] = mpl.cycler(
-            # remove # from color beginning
-            color=[x[1:] for x in colors]
-        )
-
+        decorate_all(plt)
+        decorate_all(mpl.axes.Axes)
+        decorate_all(sns)
+        sns.rp_boxplot = wraps(sns.boxplot)(_wrapped_boxplot)
+        _state["decorated"] = True
+
+    def register(name):
+        for suffix in ('', '_r'):
+            # unregister first, so replacing the aliases doesn't warn
+            mpl.colormaps.unregister('rho_' + name + suffix)
+            mpl.colormaps.register(SEQUENTIAL['mpl_' + name + suffix], name='rho_' + name + suffix)
+
+    if not _state["cmaps"]:
+        for name in SEQUENTIAL.palette_names():
+            if ('rho_' + name) not in mpl.colormaps or name in ALIASES:
+                register(name)
+        _state["cmaps"] = True
+    elif _state["is_dark"] != is_dark:
+        # these change from light to dark mode, so we need to force Matplotlib to reassign them
         for alias in ALIASES:
-            # these change from light to dark mode, so we need to force Matplotlib to reassign them
-            mpl.colormaps.unregister('rho_' + alias)
-            mpl.colormaps.unregister('rho_' + alias + '_r')
-
-        for name, palette in SEQUENTIAL.items():
-            if not isinstance(palette, SequentialPalette):
-                continue
-            cmap = palette.as_mpl_cmap()
-
-            if ('rho_' + name) not in mpl.colormaps:
-                mpl.colormaps.register(cmap, name='rho_' + name, force=True)
-                mpl.colormaps.register(cmap.reversed(), name='rho_' + name + '_r', force=True)
-
-        # https://github.com/ipython/ipykernel/issues/267
-
-        # Setting %matplotlib inline erases some styles, so the full theme doesn't
-        # take effect until you run the cell again. To fix this, if we're in IPython,
-        # load that first, so those rcParams get overwritten. Loading matplotlib
-        # with, e.g., plt.clf() also works, but it prints out the figure object, which
-        # we don't want.
-
-        # https://stackoverflow.com/questions/15411967/how-can-i-check-if-code-is-executed-in-the-ipython-notebook
-        def in_notebook():
-            try:
-                from IPython import get_ipython
-
-                if "IPKernelApp" not in get_ipython().config:  # pragma: no cover
-                    return False
-            except ImportError:
-                return False
-            except AttributeError:
-                return False
-            return True
-
-        if in_notebook():
-            try:
-                from IPython import get_ipython
-                from matplotlib_inline.backend_inline import configure_inline_support
-
-                configure_inline_support(get_ipython(), plt.get_backend())
-            except ImportError:
-                # not using this backend, no need to do anything
-                pass
-
-        plt.style.use(theme)
-
-    return (theme, colors)
+            register(alias)
+    _state["is_dark"] = is_dark
+
+    if not _state["inline"] and in_notebook():
+        try:
+            import matplotlib.pyplot as plt
+            from IPython import get_ipython
+            from matplotlib_inline.backend_inline import configure_inline_support
+
+            configure_inline_support(get_ipython(), plt.get_backend())
+        except ImportError:
+            # not using this backend, no need to do anything
+            pass
+    _state["inline"] = True
+
+    rc = rc_params(is_dark)
+    mpl.rcParams.update(rc)
+    return (dict(rc), colors)
@@ -8,6 +8,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 from .util import spread as rho_spread
 from .color_util import contrast_with
+from .render_cache import data_transform, text_extents
 
 
 def remove_crowded(ax=None):
@@ -107,35 +108,42 @@ def get_handles_labels(ax):
 
 
 def height(text, ax, **kwargs):
-    t = ax.text(0.5, 0.5, text, transform=ax.transAxes, **kwargs)
-    ax.figure.canvas.draw()
-    bb = t.get_window_extent()
-    t.remove()
-    return bb.height
+    """Height of text on ax in pixels, without drawing it."""
+    return text_extents(ax.figure, [text], **kwargs)[0, 1]
 
 
-def line_labels(ax=None, remove_legend=True, spread=None, **kwargs):
+def line_labels(ax=None, remove_legend=True, spread=None, weights=None, **kwargs):
     """Does automatic line labeling, replacing a legend with side labels.
-    Kwargs passed to ax.text: don't pass alignment or color."""
+    Labels are kept inside the axes. weights, in legend order, make labels for some lines
+    move less than others. A custom spread is called as spread(y, margin) in display units, with
+    margin half of each label's height, like util.spread, so weights and keeping labels inside
+    the axes only apply to the default spread. Kwargs passed to ax.text: don't pass alignment or
+    color."""
+    if spread is not None and weights is not None:
+        raise ValueError("weights only apply to the default spread, not a custom one")
     if ax is None:
         ax = plt.gca()
 
-    if spread is None:
-        spread = rho_spread
-
     handles, labels = get_handles_labels(ax)
     labels = ["\n".join(textwrap.wrap(label, width=15)) for label in labels]
 
-    margin = np.array([height(label, ax, **kwargs) for label in labels])
+    # labels are centered on their lines, so they need half their height on either side
+    margin = text_extents(ax.figure, labels, **kwargs)[:, 1] / 2
 
     y_ends = np.array([handle.get_xydata()[-1] for handle in handles])
 
-    spreaded_y_ends = ax.transData.transform(y_ends)
-    spreaded_y_ends[:, 1] = spread(spreaded_y_ends[:, 1], margin)
-    spreaded_y_ends = ax.transData.inverted().transform(spreaded_y_ends)
+    trans_data = data_transform(ax)
+    spreaded_y_ends = trans_data.transform(y_ends)
+    if spread is None:
+        spreaded_y_ends[:, 1] = rho_spread(
+            spreaded_y_ends[:, 1], margin, weights=weights, lower=ax.bbox.y0, upper=ax.bbox.y1
+        )
+    else:
+        spreaded_y_ends[:, 1] = spread(spreaded_y_ends[:, 1], margin)
+    spreaded_y_ends = trans_data.inverted().transform(spreaded_y_ends)
 
-    xmax = ax.transData.inverted().transform(
-        (ax.transData.transform((y_ends[:, 0].max(), 0))[0] * 1.05, 0)
+    xmax = trans_data.inverted().transform(
+        (trans_data.transform((y_ends[:, 0].max(), 0))[0] * 1.05, 0)
     )[0]
     for y_end, spreaded, handle, label in zip(y_ends, spreaded_y_ends, handles, labels):
         color = handle.get_color()
@@ -5,115 +5,156 @@ To keep the import cost of Rho+ small, the modules necessary to do this are not
 
 import abc
 from typing import List
-import matplotlib.colors as mpl_colors
 import numpy as np
 from scipy import interpolate as interp
-import colour
-from colour.utilities import suppress_warnings
 from scipy import stats as stats
 import scipy.signal as signal
 from .palettes import SequentialPaletteMixin
+from .color_util import lin2srgb, m1, m2, srgb2lin, srgb_m1, srgb_minv, to_hex_arr, to_rgb_arr
 
+# these follow colour-science's sRGB -> XYZ -> Oklab path exactly, so palettes built here
+# match ones built with colour.convert
+m1_inv = np.linalg.inv(m1)
+m2_inv = np.linalg.inv(m2)
 
-def hex2oklch(hexs):
-    with suppress_warnings(colour_usage_warnings=True):
-        lchs = []
-        if isinstance(hexs, str):
-            hexs = [hexs]
-        for hex in hexs:
-            L, a, b = colour.convert(mpl_colors.to_rgb(hex), "sRGB", "Oklab")
-            h = np.rad2deg(np.arctan2(b, a)) % 360
-            c = np.hypot(b, a)
-            lchs.append(np.array([L, c, h]))
 
-    return np.array(lchs)
+def srgb2oklab(rgb):
+    """Converts an array of sRGB colors to Oklab, returning an (N, 3) array."""
+    lin = srgb2lin(np.asarray(rgb, dtype=np.float64).reshape(-1, 3))
+    lms = np.cbrt(lin @ (m1 @ srgb_m1).T)
+    return lms @ m2.T
 
 
-def oklch2hex(oklch):
-    with suppress_warnings(colour_usage_warnings=True):
-        return np.array(
-            [
-                mpl_colors.to_hex(
-                    np.clip(
-                        colour.convert(
-                            (L, c * np.cos(np.deg2rad(h)), c * np.sin(np.deg2rad(h))),
-                            "Oklab",
-                            "sRGB",
-                        ),
-                        0,
-                        1,
-                    )
-                )
-                for L, c, h in np.array(oklch).reshape(-1, 3)
-            ]
-        )
+def oklab2srgb(oklab):
+    """Converts an array of Oklab colors to (unclipped) sRGB, returning an (N, 3) array."""
+    lms = (np.asarray(oklab, dtype=np.float64).reshape(-1, 3) @ m2_inv.T) ** 3
+    return lin2srgb(lms @ (srgb_minv @ m1_inv).T)
+
+
+def oklab2oklch(labs):
+    L, a, b = np.asarray(labs, dtype=np.float64).reshape(-1, 3).T
+    return np.stack([L, np.hypot(b, a), np.rad2deg(np.arctan2(b, a)) % 360], axis=1)
+
+
+def oklch2oklab(lchs):
+    L, c, h = np.asarray(lchs, dtype=np.float64).reshape(-1, 3).T
+    h = np.deg2rad(h)
+    return np.stack([L, c * np.cos(h), c * np.sin(h)], axis=1)
 
 
 def hex2oklab(hexs):
-    with suppress_warnings(colour_usage_warnings=True):
-        labs = []
-        if isinstance(hexs, str):
-            hexs = [hexs]
-        for hex in hexs:
-            L, a, b = colour.convert(mpl_colors.to_rgb(hex), "sRGB", "Oklab")
-            labs.append(np.array([L, a, b]))
+    return srgb2oklab(to_rgb_arr(hexs))
 
-        return np.array(labs)
+
+def hex2oklch(hexs):
+    return oklab2oklch(hex2oklab(hexs))
 
 
 def oklab2hex(oklab):
-    with suppress_warnings(colour_usage_warnings=True):
-        return np.array(
-            [
-                mpl_colors.to_hex(np.clip(colour.convert(lab, "Oklab", "sRGB"), 0, 1))
-                for lab in np.array(oklab).reshape(-1, 3)
-            ]
-        )
+    return to_hex_arr(np.clip(oklab2srgb(oklab), 0, 1))
 
 
-def oklch2scd(oklch):
-    with colour.utilities.suppress_warnings(colour_usage_warnings=True):
-        return np.array(
-            [
-                colour.convert(
-                    (L, c * np.cos(np.deg2rad(h)), c * np.sin(np.deg2rad(h))),
-                    "Oklab",
-                    "CAM16SCD",
-                )
-                for L, c, h in np.array(oklch).reshape(-1, 3)
-            ]
-        )
+def oklch2hex(oklch):
+    return oklab2hex(oklch2oklab(oklch))
 
 
-def oklab2oklch(labs):
-    lchs = []
-    for (L, a, b) in labs.reshape(-1, 3):
-        h = np.rad2deg(np.arctan2(b, a)) % 360
-        c = np.hypot(b, a)
-        lchs.append(np.array([L, c, h]))
+# CAM16 with the same fixed viewing conditions colour.convert uses for "CAM16SCD": D65 white,
+# L_A = 64 / pi * 0.2, Y_b = 20, average surround, and the CAM02-SCD coefficients of Luo et al.
+# (2006) for the uniform color space.
+MATRIX_16 = np.array(
+    [
+        [0.401288, 0.650173, -0.051461],
+        [-0.250268, 1.204414, 0.045854],
+        [-0.002079, 0.048952, 0.953127],
+    ]
+)
+CAM16_XYZ_W = np.array([0.95045593, 1.0, 1.08905775]) * 100
+CAM16_L_A = 64 / np.pi * 0.2
+CAM16_Y_B = 20
+CAM16_F, CAM16_C, CAM16_N_C = 1, 0.69, 1
+SCD_K_L, SCD_C_1, SCD_C_2 = 1.24, 0.007, 0.0363
 
-    return np.array(lchs)
 
+def _cam16_constants():
+    """Computes the viewing-condition-dependent parameters of CAM16."""
+    Y_w = CAM16_XYZ_W[1]
+    D = np.clip(CAM16_F * (1 - (1 / 3.6) * np.exp((-CAM16_L_A - 42) / 92)), 0, 1)
+    n = CAM16_Y_B / Y_w
+    k = 1 / (5 * CAM16_L_A + 1)
+    F_L = 0.2 * k**4 * (5 * CAM16_L_A) + 0.1 * (1 - k**4) ** 2 * (5 * CAM16_L_A) ** (1 / 3)
+    N_bb = N_cb = 0.725 * (1 / n) ** 0.2
+    z = 1.48 + np.sqrt(n)
 
-def oklch2oklab(lchs):
-    labs = []
-    for (L, c, h) in lchs.reshape(-1, 3):
-        a = c * np.cos(np.deg2rad(h))
-        b = c * np.sin(np.deg2rad(h))
-        labs.append(np.array([L, a, b]))
+    RGB_w = MATRIX_16 @ CAM16_XYZ_W
+    D_RGB = D * Y_w / RGB_w + 1 - D
+    RGB_aw = _cam16_compress(D_RGB * RGB_w, F_L)
+    A_w = (2 * RGB_aw[0] + RGB_aw[1] + RGB_aw[2] / 20 - 0.305) * N_bb
 
-    return np.array(labs)
+    return D_RGB, F_L, n, N_bb, N_cb, z, A_w
+
+
+def _spow(x, p):
+    """Sign-preserving power, which CAM16 uses to stay defined for very dark colors."""
+    return np.sign(x) * np.abs(x) ** p
+
+
+def _cam16_compress(RGB, F_L):
+    """Post-adaptation non-linear response compression."""
+    F_L_RGB = (F_L * np.abs(RGB) / 100) ** 0.42
+    return 400 * np.sign(RGB) * F_L_RGB / (27.13 + F_L_RGB) + 0.1
+
+
+_CAM16 = _cam16_constants()
+
+
+def oklab2scd(oklab):
+    """Converts Oklab to CAM16-SCD (J', a', b'), the CAM16 uniform color space with the
+    CAM02-SCD coefficients, returning an (N, 3) array. Vectorized over all colors, and
+    matches colour.convert(..., "Oklab", "CAM16SCD")."""
+    D_RGB, F_L, n, N_bb, N_cb, z, A_w = _CAM16
+
+    lms = (np.asarray(oklab, dtype=np.float64).reshape(-1, 3) @ m2_inv.T) ** 3
+    xyz = lms @ (100 * m1_inv).T
+
+    RGB_a = _cam16_compress(xyz @ (D_RGB[:, None] * MATRIX_16).T, F_L)
+    R, G, B = RGB_a.T
+
+    a = R - 12 * G / 11 + B / 11
+    b = (R + G - 2 * B) / 9
+    h = np.arctan2(b, a)
+    e_t = 1 / 4 * (np.cos(2 + h) + 3.8)
+
+    A = (2 * R + G + B / 20 - 0.305) * N_bb
+    J = 100 * _spow(A / A_w, CAM16_C * z)
+
+    t = (50000 / 13 * CAM16_N_C * N_cb) * e_t * np.hypot(a, b) / (R + G + 21 / 20 * B)
+    C = _spow(t, 0.9) * _spow(J / 100, 0.5) * (1.64 - 0.29**n) ** 0.73
+    M = C * F_L**0.25
+
+    J_p = (1 + 100 * SCD_C_1) * J / (1 + SCD_C_1 * J)
+    M_p = np.log1p(SCD_C_2 * M) / SCD_C_2
+    return np.stack([J_p, M_p * np.cos(h), M_p * np.sin(h)], axis=1) / 100
+
+
+def oklch2scd(oklch):
+    return oklab2scd(oklch2oklab(oklch))
 
 
 class OklchPalette(SequentialPaletteMixin):
     """A sequential color palette in Oklch space."""
 
-    def __init__(self, name, keys, hue_cool, nodes=None, correct=True):
+    def __init__(self, name, keys, hue_cool, nodes=None, correct=True, resolution=256, quantize=True):
         """Keys is a list of colors. Hue_cool is a matching list of Booleans (with first element removed)
         indicating whether the interpolation to that color should go forward (ROYGBIV) or backwards.
         Nodes, if given, is a list of numbers the same length as keys that indicate how they should be spaced.
         (Scaled within [0, 1].)
-        If correct, then apply a correction to ensure perceptual uniformity."""
+        If correct, then apply a correction to ensure perceptual uniformity.
+        Resolution is the number of colors in hex_colors(), and the number of samples the corrections use.
+        If quantize, the corrections measure the samples as 8-bit colors, like the serialized palettes have
+        always been built; otherwise they measure the unrounded samples, which changes the output."""
+        self.resolution = resolution
+        self.quantize = quantize
+        self._samples = {}
 
         if isinstance(keys[0], str):
             self.keys = keys
@@ -165,7 +206,7 @@ class OklchPalette(SequentialPaletteMixin):
         # so we get the cumulative lightness changes and then resample to evenly space those out
 
         # cumulative lightness change (now monotonic)
-        ll = hex2oklch(self.colors(256))[:, 0]
+        ll = self._measured_samples(self.resolution)[:, 0]
         abs_ll = np.cumsum(np.abs(np.diff(ll, prepend=0)))
 
         # interpolate from % of total cumulative lightness to [0, 1] in original
@@ -182,10 +223,10 @@ class OklchPalette(SequentialPaletteMixin):
             # required to achieve that equispaced map in the original
             self.spline = lambda x: self.uncorrected_spline(corr_spline(x))
 
-    def cam16_correct(self):
-        """Corrects for any perceptual uniformity issues by resampling the colormap for CAM16 uniformity."""
-        lch = hex2oklch(self.colors(256))
-        scd = oklch2scd(lch)
+    def cam16_correct(self, n=None):
+        """Corrects for any perceptual uniformity issues by resampling the colormap for CAM16 uniformity.
+        Measures uniformity using n samples, by default the resolution."""
+        scd = oklab2scd(self._measured_samples(self.resolution if n is None else n))
         diffs = np.diff(scd, prepend=0, axis=0)
         abs_ll = np.cumsum(np.linalg.norm(diffs, axis=1))
 
@@ -207,12 +248,12 @@ class OklchPalette(SequentialPaletteMixin):
         """Uses a Gaussian filter to smooth the variation, removing discontinuities."""
         # https://arxiv.org/pdf/1509.03700.pdf
         # the more smoothing, the more the area in the middle is difficult to distinguish, but the less it pops out as a false feature
-        # sigma around 5-7 for a 256-color map is recommended
+        # sigma around 5-7 for a 256-color map is recommended, so we scale that to the resolution
+        scale = self.resolution / 256
 
-        # cumulative lightness change (now monotonic)
-        lab = hex2oklab(self.colors(256))
+        lab = self._measured_samples(self.resolution)
         # pad with the end values
-        window_size = 40
+        window_size = int(round(40 * scale))
         lab_padded = np.vstack(
             [
                 np.tile(lab[0], (window_size // 2, 1)),
@@ -221,7 +262,7 @@ class OklchPalette(SequentialPaletteMixin):
             ]
         )
         window = stats.norm.pdf(
-            np.arange(-window_size // 2, window_size // 2 + 1), scale=6
+            np.arange(-window_size // 2, window_size // 2 + 1), scale=6 * scale
         )
         window /= np.sum(window)
         smoothed_lab = np.vstack(
@@ -235,12 +276,47 @@ class OklchPalette(SequentialPaletteMixin):
             axis=0,
         )
 
+    @property
+    def spline(self):
+        """Maps [0, 1] to Oklch colors."""
+        return self._spline
+
+    @spline.setter
+    def spline(self, spline):
+        self._spline = spline
+        # corrections replace the spline, so anything sampled from the old one is stale
+        self._samples = {}
+
+    def _sampled(self, kind, n, compute):
+        key = (kind, n)
+        if key not in self._samples:
+            self._samples[key] = compute()
+        return self._samples[key]
+
+    def rgb_samples(self, n):
+        """Gets n evenly-spaced colors as an (n, 3) array of sRGB, clipped to the gamut. Memoized."""
+        return self._sampled(
+            "rgb", n, lambda: np.clip(oklab2srgb(oklch2oklab(self.spline(np.linspace(0, 1, n)))), 0, 1)
+        )
+
+    def oklab_samples(self, n):
+        """Gets n evenly-spaced colors, as displayed (clipped to the gamut), as an (n, 3) array of Oklab. Memoized."""
+        return self._sampled("oklab", n, lambda: srgb2oklab(self.rgb_samples(n)))
+
+    def _measured_samples(self, n):
+        """The n Oklab samples the corrections measure."""
+        if not self.quantize:
+            return self.oklab_samples(n)
+        return self._sampled(
+            "oklab8", n, lambda: srgb2oklab(np.rint(self.rgb_samples(n) * 255) / 255)
+        )
+
     def colors(self, n):
-        """Gets the palette as a list of n colors."""
-        return oklch2hex(self.spline(np.linspace(0, 1, n)))
+        """Gets the palette as a list of n colors. Memoized."""
+        return self._sampled("hex", n, lambda: to_hex_arr(self.rgb_samples(n)))
 
     def hex_colors(self):
-        return self.colors(256)
+        return self.colors(self.resolution)
 
     def name(self):
         return self._name
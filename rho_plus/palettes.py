@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 import abc
-from typing import List
+from typing import List, Optional, Sequence, Union
+import numpy as np
 import matplotlib.colors as mpl_colors
+from .color_util import BLOCK_SIZE, to_hex_arr, to_rgb_arr
 
 
 class SequentialPaletteMixin(abc.ABC):
@@ -19,6 +21,114 @@ class SequentialPaletteMixin(abc.ABC):
         """Returns a list of hex colors to interpolate between."""
         raise NotImplementedError("Subclasses must implement method hex_colors")
 
+    def rgb_colors(self) -> np.ndarray:
+        """Returns the colors as an (N, 3) uint8 array."""
+        return np.rint(to_rgb_arr(self.hex_colors()) * 255).astype(np.uint8)
+
+    def lut(self, dtype=np.uint8, bad=(0, 0, 0, 0)) -> np.ndarray:
+        """Returns an (N + 1, 4) RGBA lookup table, with the bad color last. Integer dtypes are
+        scaled to their full range, and floats are from 0 to 1. The table is cached, so don't
+        modify it."""
+        dtype = np.dtype(dtype)
+        key = (dtype, tuple(bad))
+        luts = self.__dict__.setdefault("_luts", {})
+        if key not in luts:
+            rgb = self.rgb_colors()
+            lut = np.empty((len(rgb) + 1, 4), dtype=np.float64)
+            lut[:-1, :3] = rgb / 255
+            lut[:-1, 3] = 1
+            lut[-1] = mpl_colors.to_rgba(bad)
+            if dtype.kind in "ui":
+                lut = np.rint(lut * np.iinfo(dtype).max)
+            luts[key] = lut.astype(dtype)
+            luts[key].flags.writeable = False
+        return luts[key]
+
+    def map(
+        self,
+        values,
+        vmin: Optional[float] = None,
+        vmax: Optional[float] = None,
+        out: Optional[np.ndarray] = None,
+        dtype=np.uint8,
+        norm: str = "linear",
+        linthresh: float = 1,
+        bad: Sequence[float] = (0, 0, 0, 0),
+        chunk_size: int = BLOCK_SIZE,
+    ) -> np.ndarray:
+        """Colors an array of scalars, returning an array of shape values.shape + (4,) (or out,
+        if given) of RGBA in dtype.
+
+        This does the same thing as calling as_mpl_cmap() with a Normalize, LogNorm, or
+        SymLogNorm (with base 10 and linscale 1), but it looks colors up directly in an integer
+        table, chunk_size values at a time, so the output is the only full-size allocation.
+        vmin and vmax default to the minimum and maximum finite values, which takes an extra
+        pass over the data. Values outside the range get the end colors, and NaN (or
+        nonpositive values, with a log norm) get bad."""
+        values = np.asarray(values)
+        if norm not in ("linear", "log", "symlog"):
+            raise ValueError(f"Unknown norm {norm}: should be linear, log, or symlog")
+
+        lut = self.lut(dtype if out is None else out.dtype, bad)
+        n = len(lut) - 1
+        if out is None:
+            out = np.empty(values.shape + (4,), dtype=lut.dtype)
+        flat_out = out.reshape(-1, 4)
+        # empty arrays never share memory, so there's nothing to check or color
+        if values.size == 0 and out.shape == values.shape + (4,):
+            return out
+        if flat_out.shape[0] != values.size or not np.shares_memory(flat_out, out):
+            raise ValueError(f"out should be a contiguous array of shape {values.shape + (4,)}")
+
+        flat = values.reshape(-1)
+        ftype = np.result_type(values.dtype, np.float32)
+
+        def transform(x):
+            x = x.astype(ftype, copy=False)
+            if norm == "log":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    return np.log10(np.where(x > 0, x, np.nan))
+            elif norm == "symlog":
+                # same as matplotlib's SymLogNorm with base 10, linscale 1
+                linscale = 1 / (1 - 1 / 10)
+                ax = np.abs(x)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    log = np.sign(x) * linthresh * (linscale + np.log10(ax / linthresh))
+                return np.where(ax > linthresh, log, x * linscale)
+            return x
+
+        if vmin is None or vmax is None:
+            lo, hi = np.inf, -np.inf
+            for start in range(0, flat.size, chunk_size):
+                chunk = transform(flat[start : start + chunk_size])
+                chunk = chunk[np.isfinite(chunk)]
+                if chunk.size:
+                    lo, hi = min(lo, chunk.min()), max(hi, chunk.max())
+            tmin = lo if vmin is None else transform(np.array([vmin]))[0]
+            tmax = hi if vmax is None else transform(np.array([vmax]))[0]
+        else:
+            tmin, tmax = transform(np.array([vmin, vmax]))
+        # Python floats, so float32 data stays float32, like in matplotlib
+        tmin, tmax = float(tmin), float(tmax)
+        if not tmin <= tmax:
+            raise ValueError("vmin must be less than or equal to vmax")
+
+        for start in range(0, flat.size, chunk_size):
+            x = transform(flat[start : start + chunk_size])
+            if tmin == tmax:
+                # matplotlib maps everything to the bottom of the colormap in this case
+                x = np.where(np.isnan(x), np.nan, 0)
+            else:
+                x = (x - tmin) / (tmax - tmin)
+            x *= n
+            isbad = np.isnan(x)
+            x[isbad] = 0
+            np.clip(x, 0, n - 1, out=x)
+            idx = x.astype(np.intp)
+            idx[isbad] = n
+            np.take(lut, idx, axis=0, out=flat_out[start : start + chunk_size])
+        return out
+
     def rev(self) -> SequentialPaletteMixin:
         """Returns a reversed version of the color palette."""
         return ReversedPalette(self)
@@ -42,9 +152,14 @@ class ReversedPalette(SequentialPaletteMixin):
     def hex_colors(self) -> List[str]:
         return self.rev_palette.hex_colors()[::-1]
 
+    def rgb_colors(self) -> np.ndarray:
+        return self.rev_palette.rgb_colors()[::-1]
+
 
 class SequentialPalette(SequentialPaletteMixin):
-    def __init__(self, name: str, colors: List[str]):
+    def __init__(self, name: str, colors: Union[List[str], np.ndarray]):
+        """Colors is either a list of hex colors or an (N, 3) uint8 array of RGB, which is used
+        without copying."""
         self._name = name
         self._colors = colors
 
@@ -57,4 +172,21 @@ class SequentialPalette(SequentialPaletteMixin):
         return self._name
 
     def hex_colors(self) -> List[str]:
+        if isinstance(self._colors, np.ndarray):
+            if not hasattr(self, "_hex"):
+                self._hex = to_hex_arr(self._colors / 255).tolist()
+            return self._hex
         return self._colors
+
+    def rgb_colors(self) -> np.ndarray:
+        if isinstance(self._colors, np.ndarray):
+            return self._colors
+        return super().rgb_colors()
+
+    def as_mpl_cmap(self) -> mpl_colors.Colormap:
+        if isinstance(self._colors, np.ndarray):
+            # skip the round trip through hex
+            return mpl_colors.LinearSegmentedColormap.from_list(
+                self.name(), self._colors / 255, N=len(self._colors)
+            )
+        return super().as_mpl_cmap()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 from .bokeh import rho_light, rho_dark
 from .bokeh import setup as bokeh_setup
-from .matplotlib import setup as mpl_setup
+from .theme_tokens import theme_tokens
 import param
 import json
 import panel as pn
@@ -77,10 +77,6 @@ class ThemedPanel(param.Parameterized):
     @pn.depends("colorMode")
     def colors_theme(self):
         """Returns a (colors, theme) tuple indicating the categorical colors and Bokeh theme."""
-        if self.colorMode == "light":
-            _theme, colors = mpl_setup(False, False)
-        else:
-            _theme, colors = mpl_setup(True, False)
-
+        colors = list(theme_tokens(self.colorMode != "light").colors)
         theme = rho_light if self.colorMode == "light" else rho_dark
         return (colors, theme)
@@ -1,93 +1,93 @@
 #!/usr/bin/env python3
 """Plotly theming."""
 
-import json
-
-import matplotlib as mpl
-
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
 
-import plotly.graph_objects as go
-import numpy as np
-
-from .matplotlib import setup as mpl_setup
+from .compiled_themes import load_theme
+from .theme_tokens import theme_tokens
 from .util import decorate_all
-from .sequential_palettes import SEQUENTIAL, setup_cmap_aliases
+
+
+def build_template(is_dark: bool) -> go.layout.Template:
+    """Builds the theme from scratch, on top of Plotly's default template."""
+    inherit = "plotly_dark" if is_dark else "plotly"
+    default = pio.templates[inherit].layout
+    tokens = theme_tokens(is_dark)
+    s = tokens.shades
+    templ: go.Layout = go.Layout(default)
+    templ.colorscale.sequential = templ.colorscale.sequentialminus = list(
+        tokens.sequential[::17]
+    )
+    templ.colorscale.diverging = list(tokens.diverging[2:-1:18])
+
+    templ.paper_bgcolor = s.empty
+    templ.plot_bgcolor = s.empty
+    templ.colorway = list(tokens.colors)
+    templ.margin = go.layout.Margin(b=20, l=20, r=20, t=30)
+    for ax in (
+        templ.xaxis,
+        templ.yaxis,
+        templ.scene.xaxis,
+        templ.scene.yaxis,
+        templ.scene.zaxis,
+    ):
+        ax.tickcolor = s.medium
+        ax.linecolor = s.light
+
+        ax.gridcolor = s.light
+        ax.tickfont["color"] = s.dark
+        ax.title.font["color"] = s.darkest
+        ax.showline = True
+        ax.showgrid = False
+        ax.mirror = False
+
+    for ax in (templ.scene.xaxis, templ.scene.yaxis, templ.scene.zaxis):
+        ax.showgrid = True
+        ax.backgroundcolor = s.empty
+
+    templ.legend.bgcolor = s.empty
+    templ.legend.bordercolor = s.light
+    templ.legend.borderwidth = tokens.sizes.border
+    templ.legend.font.color = s.dark
+    templ.legend.title.font.color = s.darkest
+
+    # I'm tempted to keep Plotly's default of using the color of the mark for the hover color, but ultimately
+    # I think this is more minimal without being any harder to understand: if you hover, you're already
+    # looking at the data, so the extra color cue isn't especially necessary
+    templ.hoverlabel.bgcolor = s.empty
+    templ.hoverlabel.bordercolor = s.light
+    templ.hoverlabel.font.color = s.darkest
+
+    data = go.layout.template.Data(
+        # https://github.com/plotly/plotly.py/issues/3404
+        # I'd rather have filled box plots by default, but Plotly doesn't support altering the default of half-transparency fill color (God only knows why...)
+        # so I can't make the fill color just the line color, so my choices are half transparency or transparent
+        box=(
+            go.Box(
+                marker_line_color=s.empty,
+                notchwidth=0,
+                fillcolor="rgba(0,0,0,0)",
+            ),
+        ),
+        # same issue as box plots with violin plots: here, we have the fill because otherwise it looks a little too empty
+        # I'd rather have a solid meanline, but that's not an option
+        violin=(go.Violin(meanline=dict(visible=True)),),
+        scatter=(go.Scatter(marker=dict(line=dict(color=s.empty))),),
+    )
+    return go.layout.Template(layout=templ, data=data)
 
 
 def register_themes():
+    """Registers the themes compiled into rho_plus/data, rebuilding them if they're stale."""
     for theme_name, is_dark in zip(("rho_light", "rho_dark"), (False, True)):
-        inherit = "plotly_dark" if is_dark else "plotly"
-        default = pio.templates[inherit].layout
-        setup_cmap_aliases(is_dark)
-        templ: go.Layout = go.Layout(default)
-        templ.colorscale.sequential = templ.colorscale.sequentialminus = SEQUENTIAL[
-            "sequential"
-        ].hex_colors()[::17]
-        templ.colorscale.diverging = (
-            SEQUENTIAL["diverging"]
-        ).hex_colors()[2:-1:18]
-
-        _theme, cs = mpl_setup(is_dark=is_dark, setup=True)
-        rc = mpl.rcParams
-
-        templ.paper_bgcolor = rc["axes.facecolor"]
-        templ.plot_bgcolor = rc["axes.facecolor"]
-        templ.colorway = cs
-        templ.margin = go.layout.Margin(b=20, l=20, r=20, t=30)
-        for ax in (
-            templ.xaxis,
-            templ.yaxis,
-            templ.scene.xaxis,
-            templ.scene.yaxis,
-            templ.scene.zaxis,
-        ):
-            ax.tickcolor = rc["xtick.color"]
-            ax.linecolor = rc["axes.edgecolor"]
-
-            ax.gridcolor = rc["axes.edgecolor"]
-            ax.tickfont["color"] = rc["xtick.labelcolor"]
-            ax.title.font["color"] = rc["axes.labelcolor"]
-            ax.showline = True
-            ax.showgrid = False
-            ax.mirror = False
-
-        for ax in (templ.scene.xaxis, templ.scene.yaxis, templ.scene.zaxis):
-            ax.showgrid = True
-            ax.backgroundcolor = rc["axes.facecolor"]
-
-        templ.legend.bgcolor = rc["axes.facecolor"]
-        templ.legend.bordercolor = rc["legend.edgecolor"]
-        templ.legend.borderwidth = 2
-        templ.legend.font.color = rc["legend.labelcolor"]
-        templ.legend.title.font.color = rc["axes.labelcolor"]
-
-        # I'm tempted to keep Plotly's default of using the color of the mark for the hover color, but ultimately
-        # I think this is more minimal without being any harder to understand: if you hover, you're already
-        # looking at the data, so the extra color cue isn't especially necessary
-        templ.hoverlabel.bgcolor = rc["axes.facecolor"]
-        templ.hoverlabel.bordercolor = rc["axes.edgecolor"]
-        templ.hoverlabel.font.color = rc["text.color"]
-
-        data = go.layout.template.Data(
-            # https://github.com/plotly/plotly.py/issues/3404
-            # I'd rather have filled box plots by default, but Plotly doesn't support altering the default of half-transparency fill color (God only knows why...)
-            # so I can't make the fill color just the line color, so my choices are half transparency or transparent
-            box=(
-                go.Box(
-                    marker_line_color=rc["axes.facecolor"],
-                    notchwidth=0,
-                    fillcolor="rgba(0,0,0,0)",
-                ),
-            ),
-            # same issue as box plots with violin plots: here, we have the fill because otherwise it looks a little too empty
-            # I'd rather have a solid meanline, but that's not an option
-            violin=(go.Violin(meanline=dict(visible=True)),),
-            scatter=(go.Scatter(marker=dict(line=dict(color=rc["axes.facecolor"]))),),
-        )
-        pio.templates[theme_name] = go.layout.Template(layout=templ, data=data)
+        template = load_theme("plotly", theme_name, lambda: build_template(is_dark).to_plotly_json())
+        # the compiled JSON came from a validated template, so skip validating it again
+        pio.templates[theme_name] = go.layout.Template(template, _validate=False)
+
+
+register_themes()
 
 
 def setup(is_dark, wrap_for_eval=True):
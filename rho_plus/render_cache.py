@@ -0,0 +1,131 @@
+"""A cache for what the labeling helpers compute from a figure: rasters of what's drawn, text
+extents, and data transforms.
+
+Entries are kept per figure, with the figures weakly referenced so the cache doesn't keep them
+alive, and each figure's entries are dropped whenever it's drawn, because anything computed
+from the last render may be stale. Each figure keeps at most maxsize entries, evicting the least
+recently used. Cached values shouldn't reference the figure or its artists: keys can, through
+weakref.ref."""
+
+from collections import OrderedDict, namedtuple
+import threading
+from typing import Callable, Hashable
+import weakref
+
+import numpy as np
+
+from .text_metrics import text_extents as _text_extents
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+MAXSIZE = 32
+
+
+class RenderCache:
+    """Per-figure LRU caches that are cleared when their figure is drawn."""
+
+    def __init__(self, maxsize: int = MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # figure -> OrderedDict of its entries, oldest first
+        self._entries = weakref.WeakKeyDictionary()
+        # figure -> weak reference to the canvas its draw_event listener is on
+        self._canvases = weakref.WeakKeyDictionary()
+        self._lock = threading.RLock()
+
+    def get(self, figure, key: Hashable, compute: Callable):
+        """The value cached for the figure under key, calling compute to make it if there isn't
+        one."""
+        with self._lock:
+            entries = self._entries.get(figure)
+            if entries is not None and key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._watch(figure)
+            entries = self._entries.setdefault(figure, OrderedDict())
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        return value
+
+    def _watch(self, figure):
+        """Listens for the figure being drawn, if it isn't already."""
+        canvas = figure.canvas
+        watched = self._canvases.get(figure)
+        if watched is not None and watched() is canvas:
+            return
+
+        cache_ref = weakref.ref(self)
+        figure_ref = weakref.ref(figure)
+
+        def on_draw(event):
+            cache, figure = cache_ref(), figure_ref()
+            if cache is not None and figure is not None:
+                cache.invalidate(figure)
+
+        canvas.mpl_connect("draw_event", on_draw)
+        self._canvases[figure] = weakref.ref(canvas)
+
+    def invalidate(self, figure=None):
+        """Drops the entries for a figure, or for every figure if it's None."""
+        with self._lock:
+            if figure is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(figure, None)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            currsize = sum(len(entries) for entries in self._entries.values())
+            return CacheInfo(self.hits, self.misses, self.maxsize, currsize)
+
+    def cache_clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self.invalidate()
+            self.hits = self.misses = 0
+
+
+RENDER_CACHE = RenderCache()
+
+
+def cache_info() -> CacheInfo:
+    """Hits, misses, and size of the render cache the labeling helpers share."""
+    return RENDER_CACHE.cache_info()
+
+
+def cache_clear():
+    RENDER_CACHE.cache_clear()
+
+
+def data_transform(ax):
+    """A frozen copy of the axes' data transform, which is cheaper to apply. The key includes the
+    limits and position of the axes, so it stays right when they change between draws."""
+    key = ("transData", weakref.ref(ax), ax.viewLim.bounds, ax.bbox.bounds,
+           ax.get_xscale(), ax.get_yscale())
+    return RENDER_CACHE.get(ax.figure, key, lambda: ax.transData.frozen())
+
+
+def text_extents(figure, texts, **kwargs) -> np.ndarray:
+    """text_metrics.text_extents at the figure's dpi. Read-only."""
+    texts = tuple(texts)
+    try:
+        key = ("text_extents", texts, figure.dpi, tuple(sorted(kwargs.items())))
+        hash(key)
+    except TypeError:
+        # e.g., a dict of bbox properties
+        return _text_extents(texts, figure.dpi, **kwargs)
+
+    def compute():
+        extents = _text_extents(texts, figure.dpi, **kwargs)
+        extents.flags.writeable = False
+        return extents
+
+    return RENDER_CACHE.get(figure, key, compute)
@@ -1,48 +1,202 @@
 #!/usr/bin/env python3
-"""Reads a core set of sequential color scales."""
+"""Reads a core set of sequential color scales.
 
-from importlib.resources import open_text
+Every palette name is available as an attribute of this module, along with its reversed version
+(name + "_r"), its Matplotlib colormap ("mpl_" + name), and its list of hex colors
+("list_" + name). These are only created when first accessed."""
+
+from importlib.resources import files
 import json
-from typing import Mapping
+from typing import Dict, Iterator, List, Mapping, Union
+import numpy as np
+from .color_util import to_hex_arr
 from .palettes import SequentialPalette
 
-SEQUENTIAL_DATA = json.load(open_text("rho_plus.data", "sequential_palettes.json"))
-SEQUENTIAL: Mapping[str, SequentialPalette] = {}
+PaletteData = Union[List[str], np.ndarray]
+
+
+def load_json() -> Dict[str, List[str]]:
+    """Reads the palettes as lists of hex colors."""
+    with (files("rho_plus.data") / "sequential_palettes.json").open() as f:
+        return json.load(f)
+
+
+def load_binary() -> Dict[str, np.ndarray]:
+    """Memory-maps the palettes as an (N, 256, 3) uint8 array, returning views into it."""
+    data = files("rho_plus.data")
+    with (data / "sequential_palettes_index.json").open() as f:
+        names = json.load(f)
+    arr = np.load(data / "sequential_palettes.npy", mmap_mode="r")
+    return dict(zip(names, arr))
+
+
+def load_sequential_data() -> Dict[str, PaletteData]:
+    """Loads the palette data, preferring the binary format and falling back to JSON."""
+    try:
+        return load_binary()
+    except (OSError, ValueError, TypeError):
+        return load_json()
+
+
+class HexPalettes(Mapping):
+    """Shows palette data as lists of hex colors, converting each palette on first access."""
+
+    def __init__(self, data: Mapping[str, PaletteData]):
+        self._data = data
+        self._hex = {}
+
+    def __getitem__(self, name: str) -> List[str]:
+        if name not in self._hex:
+            colors = self._data[name]
+            if isinstance(colors, np.ndarray):
+                colors = to_hex_arr(colors / 255).tolist()
+            self._hex[name] = colors
+        return self._hex[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# the palettes as (256, 3) uint8 arrays, or hex lists if the binary data couldn't be loaded
+SEQUENTIAL_ARRAYS = load_sequential_data()
+# the palettes as lists of hex colors
+SEQUENTIAL_DATA: Mapping[str, List[str]] = HexPalettes(SEQUENTIAL_ARRAYS)
+
+
+class LazyPalettes(Mapping):
+    """Maps every palette name, plus its reversed, Matplotlib, and hex list versions, to the
+    corresponding object. Objects are created on first access and cached."""
+
+    PREFIXES = ("", "mpl_", "list_")
+    SUFFIXES = ("", "_r")
+
+    # how many previous versions of each palette keep their cached objects
+    STASH_SIZE = 4
+
+    def __init__(self):
+        self._data = {}
+        self._cache = {}
+        # name -> {id(colors): (colors, cached objects)}, for palettes that are switched back
+        # and forth, like the aliases that change with light and dark mode
+        self._stash = {}
+
+    def register(self, name: str, colors: PaletteData):
+        """Adds a palette, or replaces an existing one with new colors. If the colors are the
+        same object as one of the last few registered under that name, the objects created for
+        it are reused."""
+        old = self._data.get(name)
+        if old is colors:
+            return
+
+        stash = self._stash.setdefault(name, {})
+        cached = {key: self._cache.pop(key) for key in self._keys(name) if key in self._cache}
+        if old is not None:
+            stash[id(old)] = (old, cached)
+            while len(stash) > self.STASH_SIZE:
+                del stash[next(iter(stash))]
+
+        self._data[name] = colors
+        # the stash holds a reference to the colors, so the id can't have been reused
+        _colors, cached = stash.pop(id(colors), (None, {}))
+        self._cache.update(cached)
+
+    def palette_names(self) -> List[str]:
+        """The names of the palettes themselves, without any prefix or suffix."""
+        return list(self._data)
+
+    def _keys(self, name: str) -> Iterator[str]:
+        for prefix in self.PREFIXES:
+            for suffix in self.SUFFIXES:
+                yield prefix + name + suffix
+
+    def _parse(self, key: str):
+        """Splits a key into (prefix, name, reversed)."""
+        for prefix in self.PREFIXES:
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix):]
+            if rest in self._data:
+                return prefix, rest, False
+            elif rest.endswith("_r") and rest[:-2] in self._data:
+                return prefix, rest[:-2], True
+        raise KeyError(key)
+
+    def _build(self, key: str):
+        prefix, name, rev = self._parse(key)
+        if prefix == "":
+            palette = SequentialPalette(name, self._data[name])
+            return palette.rev() if rev else palette
+
+        palette = self[name + ("_r" if rev else "")]
+        if prefix == "mpl_":
+            return palette.as_mpl_cmap()
+        else:
+            return palette.hex_colors()
+
+    def __getitem__(self, key: str):
+        if key not in self._cache:
+            self._cache[key] = self._build(key)
+        return self._cache[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._data:
+            yield from self._keys(name)
+
+    def __len__(self) -> int:
+        return len(self._data) * len(self.PREFIXES) * len(self.SUFFIXES)
+
+    def __contains__(self, key) -> bool:
+        try:
+            self._parse(key)
+        except (KeyError, AttributeError):
+            return False
+        return True
+
+
+SEQUENTIAL: Mapping[str, Union[SequentialPalette, PaletteData]] = LazyPalettes()
 
 
 def setup_cmaps(data):
-    """Creates all of the necessary colormaps."""
+    """Registers the given palettes, which are created when first used."""
     for name, colors in data.items():
-        for namespace in (globals(), SEQUENTIAL):
-            namespace[name] = SequentialPalette(name, colors)
-            namespace[name + '_r'] = SequentialPalette(name, colors).rev()
+        SEQUENTIAL.register(name, colors)
+
+setup_cmaps(SEQUENTIAL_ARRAYS)
 
-            namespace["mpl_" + name] = SequentialPalette(name, colors).as_mpl_cmap()
-            namespace["mpl_" + name + "_r"] = (
-                SequentialPalette(name, colors).rev().as_mpl_cmap()
-            )
-            namespace["list_" + name] = SequentialPalette(name, colors).hex_colors()
-            namespace["list_" + name + "_r"] = (
-                SequentialPalette(name, colors).rev().hex_colors()
-            )
 
-setup_cmaps(SEQUENTIAL_DATA)
+def __getattr__(name):
+    try:
+        return SEQUENTIAL[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SEQUENTIAL))
+
 
 ALIASES = ['sequential', 'diverging', 'heatmap']
+ALIAS_ARRAYS = {
+    # dark mode
+    True: {
+        'sequential': SEQUENTIAL_ARRAYS['inferna'],
+        'diverging': SEQUENTIAL_ARRAYS['div_icefire_shift'],
+        'heatmap': SEQUENTIAL_ARRAYS['candela']
+    },
+    # light mode
+    False: {
+        'sequential': SEQUENTIAL_ARRAYS['inferna'][::-1],
+        'diverging': SEQUENTIAL_ARRAYS['div_coolwarm_shift'],
+        'heatmap': SEQUENTIAL_ARRAYS['lava']
+    },
+}
+ALIAS_DATA = {is_dark: HexPalettes(arrays) for is_dark, arrays in ALIAS_ARRAYS.items()}
+
+
 def setup_cmap_aliases(is_dark: bool):
     """Sets up theme-agnostic colormap names that map to existing colormaps."""
-    if is_dark:
-        colormaps = {
-            'sequential': SEQUENTIAL_DATA['inferna'],
-            'diverging': SEQUENTIAL_DATA['div_icefire_shift'],
-            'heatmap': SEQUENTIAL_DATA['candela']
-        }
-    else:
-        colormaps = {
-            'sequential': SEQUENTIAL_DATA['inferna'][::-1],
-            'diverging': SEQUENTIAL_DATA['div_coolwarm_shift'],
-            'heatmap': SEQUENTIAL_DATA['lava']
-        }
-
-    setup_cmaps(colormaps)
-    return SEQUENTIAL
\ No newline at end of file
+    setup_cmaps(ALIAS_ARRAYS[bool(is_dark)])
+    return SEQUENTIAL
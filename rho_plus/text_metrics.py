@@ -0,0 +1,135 @@
+"""Measures text without drawing it: sizes come straight from the fonts, the way the Agg backend
+measures them, so labelers can size many labels without adding artists or redrawing the figure.
+Measurements are cached by text, font properties, and dpi.
+
+This copies how Text lays out lines in Matplotlib 3.11 (LAYOUT_VERSION), using 'normal' line
+spacing from the font's OS/2 or hhea metrics, and relies on private Matplotlib APIs
+(fontManager._find_fonts_by_props, Text._linespacing, Text._preprocess_math). Other releases lay
+out text differently, so there text_extents lays out each text with an Agg renderer instead,
+which is slower but exact."""
+
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, get_hinting_flag
+from matplotlib.figure import Figure
+from matplotlib.font_manager import fontManager, get_font
+from matplotlib.mathtext import MathTextParser
+from matplotlib.texmanager import TexManager
+from matplotlib.text import Text
+
+CACHE_SIZE = 4096
+
+# the Matplotlib release whose Text layout this matches
+LAYOUT_VERSION = (3, 11)
+FONT_METRICS = tuple(int(part) for part in mpl.__version__.split(".")[:2]) == LAYOUT_VERSION
+
+# the parser the Agg renderer measures mathtext with
+_mathtext = MathTextParser("path")
+
+
+def _font(prop):
+    # Matplotlib 3.6 and later fall back through a list of fonts for missing glyphs, like Text
+    find_fonts = getattr(fontManager, "_find_fonts_by_props", fontManager.findfont)
+    return get_font(find_fonts(prop))
+
+
+@lru_cache(CACHE_SIZE)
+def line_metrics(line: str, ismath, prop, dpi: float) -> Tuple[float, float, float]:
+    """Width, height, and descent in pixels of one line of text, where ismath is True for
+    mathtext, "TeX" for usetex, and False for plain text."""
+    if ismath == "TeX":
+        # TeX measures in points
+        w, h, d = TexManager.get_text_width_height_descent(line, prop.get_size_in_points())
+        return w * dpi / 72, h * dpi / 72, d * dpi / 72
+    if ismath:
+        parse = _mathtext.parse(line, dpi, prop)
+        return parse.width, parse.height, parse.depth
+
+    font = _font(prop)
+    font.clear()
+    font.set_size(prop.get_size_in_points(), dpi)
+    font.set_text(line, 0.0, flags=get_hinting_flag())
+    w, h = font.get_width_height()
+    # FreeType measures in 64ths of a pixel
+    return w / 64, h / 64, font.get_descent() / 64
+
+
+@lru_cache(CACHE_SIZE)
+def font_height(prop, dpi: float, usetex: bool) -> Tuple[float, float, float]:
+    """Ascent, descent, and line gap of a font in pixels, from its metrics tables if it has them
+    and otherwise from measuring "lp"."""
+    if not usetex:
+        font = _font(prop)
+        scale = prop.get_size_in_points() * dpi / 72 / font.get_sfnt_table("head")["unitsPerEm"]
+        for table_name, gap, ascent, descent in (
+            ("OS/2", "sTypoLineGap", "sTypoAscender", "sTypoDescender"),
+            ("hhea", "lineGap", "ascent", "descent"),
+        ):
+            table = font.get_sfnt_table(table_name)
+            if table is not None:
+                return table[ascent] * scale, -table[descent] * scale, table[gap] * scale
+    _, h, d = line_metrics("lp", "TeX" if usetex else False, prop, dpi)
+    return h - d, d, 0.0
+
+
+def _text_extent(text: Text, dpi: float) -> Tuple[float, float]:
+    prop = text.get_fontproperties()
+    usetex = text.get_usetex()
+    linespacing = text._linespacing
+    lines = text.get_text().split("\n")
+    min_ascent, min_descent, line_gap = font_height(prop, dpi, usetex)
+    if len(lines) == 1:
+        line_gap = 0
+
+    # lines are laid out like Text does it, with either the font's line spacing or a multiple
+    # of its height
+    width = height = 0
+    for line in lines:
+        clean_line, ismath = text._preprocess_math(line)
+        w, h, d = line_metrics(clean_line, ismath, prop, dpi) if clean_line else (0, 0, 0)
+        if usetex or linespacing == "normal":
+            height += max(h - d, min_ascent) + max(d, min_descent) + line_gap
+        else:
+            height += linespacing * (min_ascent + min_descent)
+        width = max(width, w)
+    return width, height
+
+
+def _drawn_extents(texts: Iterable[str], dpi: float, **kwargs) -> np.ndarray:
+    """text_extents by laying out each text with an Agg renderer, for Matplotlib releases whose
+    Text layout this module doesn't copy."""
+    figure = Figure(dpi=dpi)
+    renderer = FigureCanvasAgg(figure).get_renderer()
+    proto = figure.text(0, 0, "", **kwargs)
+    sizes = []
+    for text in texts:
+        proto.set_text(text)
+        bbox = proto.get_window_extent(renderer)
+        sizes.append((bbox.width, bbox.height))
+    return np.array(sizes, dtype=np.float64).reshape(-1, 2)
+
+
+def text_extents(texts: Iterable[str], dpi: float = 72, **kwargs) -> np.ndarray:
+    """The width and height in pixels of each text, as an (n, 2) array, with the text properties
+    in kwargs (fontsize, fontfamily, linespacing, etc.) that Text accepts. Rotation is ignored."""
+    texts = list(texts)
+    if FONT_METRICS:
+        try:
+            return _font_extents(texts, dpi, **kwargs)
+        except AttributeError:
+            # private Matplotlib APIs this relies on changed
+            pass
+    return _drawn_extents(texts, dpi, **kwargs)
+
+
+def _font_extents(texts: Iterable[str], dpi: float, **kwargs) -> np.ndarray:
+    proto = Text(**kwargs)
+    sizes = []
+    for text in texts:
+        proto.set_text(text)
+        # like Text.get_window_extent, empty text takes up no space
+        sizes.append(_text_extent(proto, dpi) if text else (0, 0))
+    return np.array(sizes, dtype=np.float64).reshape(-1, 2)
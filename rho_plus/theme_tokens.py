@@ -0,0 +1,307 @@
+"""The design tokens every theme is built from, and emitters that turn them into themes for each
+backend.
+
+The tokens are computed once per color mode from colors.py and the palettes. The emitters are
+pure functions of the tokens that return plain dictionaries, so building the themes for every
+backend doesn't import the backends or touch their global state."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from .color_util import to_hex_arr
+from .colors import DARK_COLORS, DARK_SHADES, LIGHT_COLORS, LIGHT_SHADES
+from .sequential_palettes import ALIAS_ARRAYS, SEQUENTIAL_ARRAYS
+
+
+class Shades(NamedTuple):
+    """Neutral shades, named from a light-mode perspective."""
+
+    # primary background
+    empty: str
+    # secondary background
+    lightest: str
+    # borders and dividers
+    light: str
+    # subdued text
+    medium: str
+    # secondary foreground
+    dark: str
+    # primary foreground, text
+    darkest: str
+
+
+class Sizes(NamedTuple):
+    """Text, line, and mark sizes every theme uses. Matplotlib sizes are in points, and web
+    sizes in pixels; Bokeh gets web text sizes in ems of the browser's 16px. Layout that only
+    one backend has, like Bokeh's legend spacing or Plotly's margins, stays in its emitter."""
+
+    # Matplotlib's base text size, which its other text sizes are relative to
+    font: float = 12
+    # web text: tick and legend labels, axis and legend titles, and chart titles
+    label: float = 16
+    axis_title: float = 20
+    title: float = 22
+    # text weights
+    label_weight: int = 400
+    tick_weight: int = 600
+    title_weight: int = 400
+    figure_title_weight: int = 700
+    # lines in Matplotlib, Vega, and Bokeh, and Matplotlib's grid lines
+    line: float = 1.5
+    web_line: float = 3
+    bokeh_line: float = 4
+    grid_line: float = 1.0
+    # area of scatterplot marks on the web, in square pixels
+    mark_area: float = 100
+    # legend borders
+    border: float = 2
+    # Matplotlib's default figure size, in inches
+    figure: Tuple[float, float] = (8, 6)
+
+
+@dataclass(frozen=True)
+class ThemeTokens:
+    """Everything that differs between light and dark mode. Colors are hex strings with #."""
+
+    is_dark: bool
+    shades: Shades
+    # categorical colors
+    colors: Tuple[str, ...]
+    # the palettes behind the rho_sequential, rho_diverging, and rho_heatmap aliases
+    sequential: Tuple[str, ...]
+    diverging: Tuple[str, ...]
+    heatmap: Tuple[str, ...]
+    # palettes that don't change with the mode: one spanning almost every lightness, for
+    # heatmaps on the web, and a ramp for continuous color scales
+    wide_heatmap: Tuple[str, ...]
+    ramp: Tuple[str, ...]
+    font: str = "Source Sans 3"
+    sizes: Sizes = Sizes()
+
+
+def _hex_colors(data) -> Tuple[str, ...]:
+    if isinstance(data, np.ndarray):
+        return tuple(to_hex_arr(data / 255).tolist())
+    return tuple(data)
+
+
+def theme_tokens(is_dark: bool) -> ThemeTokens:
+    """The tokens for the given color mode, computed once."""
+    return _theme_tokens(bool(is_dark))
+
+
+@lru_cache(maxsize=None)
+def _theme_tokens(is_dark: bool) -> ThemeTokens:
+    aliases = ALIAS_ARRAYS[is_dark]
+    return ThemeTokens(
+        is_dark=is_dark,
+        shades=Shades(*(DARK_SHADES if is_dark else LIGHT_SHADES)),
+        colors=tuple(DARK_COLORS if is_dark else LIGHT_COLORS),
+        sequential=_hex_colors(aliases["sequential"]),
+        diverging=_hex_colors(aliases["diverging"]),
+        heatmap=_hex_colors(aliases["heatmap"]),
+        wide_heatmap=_hex_colors(SEQUENTIAL_ARRAYS["gouldia"]),
+        ramp=_hex_colors(SEQUENTIAL_ARRAYS["viridia"]),
+    )
+
+
+def _mpl_sizes(sizes: Sizes) -> Dict:
+    return {
+        "font.size": sizes.font,
+        "axes.titleweight": sizes.title_weight,
+        "figure.titleweight": sizes.figure_title_weight,
+        "grid.linewidth": sizes.grid_line,
+        "figure.figsize": sizes.figure,
+        "lines.linewidth": sizes.line,
+    }
+
+
+MPL_BASE = {
+    # text sizes, relative to font.size
+    "axes.labelsize": "large",
+    "axes.titlesize": "x-large",
+    "figure.titlesize": "xx-large",
+    # if grid is turned on, have it go below plots
+    "axes.axisbelow": "false",
+    "grid.linestyle": "-",
+    # turn off grid by default
+    "axes.grid": "false",
+    # turn off ticks on axes
+    "xtick.major.size": 0,
+    "xtick.minor.size": 0,
+    "ytick.major.size": 0,
+    "ytick.minor.size": 0,
+    # sans-serif by default
+    "font.family": "sans-serif",
+    # use Computer Modern for LaTeX
+    "mathtext.fontset": "cm",
+    # turn off right and top spines
+    "axes.spines.right": "false",
+    "axes.spines.top": "false",
+    "image.cmap": "rho_sequential",
+    # default figure size, a bit more than 6.4 x 4.8, font size, weights, and line widths
+    **_mpl_sizes(Sizes()),
+}
+
+
+def mpl_theme(tokens: ThemeTokens) -> Dict:
+    """Matplotlib rcParams, with colors as hex without the #."""
+    empty, lightest, light, medium, dark, darkest = [x[1:] for x in tokens.shades]
+    rc = MPL_BASE.copy()
+    rc.update(_mpl_sizes(tokens.sizes))
+    rc["figure.facecolor"] = empty
+    rc["savefig.facecolor"] = empty
+    rc["axes.facecolor"] = empty
+
+    rc["axes.edgecolor"] = light
+    rc["grid.color"] = light
+    rc["figure.edgecolor"] = light
+    rc["savefig.edgecolor"] = light
+    rc["legend.edgecolor"] = light
+    rc["boxplot.flierprops.color"] = light
+    rc["boxplot.boxprops.color"] = light
+    rc["boxplot.whiskerprops.color"] = light
+    rc["boxplot.capprops.color"] = light
+
+    rc["xtick.color"] = medium
+    rc["ytick.color"] = medium
+
+    rc["xtick.labelcolor"] = dark
+    rc["ytick.labelcolor"] = dark
+    rc["legend.labelcolor"] = dark
+
+    rc["text.color"] = darkest
+    rc["axes.labelcolor"] = darkest
+    rc["axes.titlecolor"] = darkest
+    return rc
+
+
+def bokeh_theme(tokens: ThemeTokens) -> Dict:
+    """JSON for a Bokeh Theme."""
+    s = tokens.shades
+    sizes = tokens.sizes
+    font = f"'{tokens.font}', sans-serif"
+    label, axis_title, title = (
+        f"{size / 16:g}em" for size in (sizes.label, sizes.axis_title, sizes.title)
+    )
+    return {
+        "attrs": {
+            "figure": {
+                "background_fill_color": s.empty,
+                "border_fill_color": s.empty,
+                # spine of axis
+                "outline_line_color": s.empty,
+            },
+            "Grid": {"grid_line_alpha": 0, "minor_grid_line_alpha": 0,},
+            "Title": {
+                "text_color": s.darkest,
+                "text_font": font,
+                "align": "center",
+                "text_font_size": title,
+                "text_font_style": "normal",
+            },
+            "Axis": {
+                "major_tick_line_color": s.medium,
+                "major_tick_line_width": 1,
+                "major_tick_out": 10,
+                "minor_tick_line_color": s.medium,
+                "major_label_text_color": s.dark,
+                "major_label_text_font": font,
+                "major_label_text_font_size": label,
+                "minor_tick_out": 0,
+                "axis_label_standoff": 10,
+                "axis_label_text_color": s.darkest,
+                "axis_label_text_font": font,
+                "axis_label_text_font_size": axis_title,
+                "axis_label_text_font_style": "normal",
+            },
+            "YAxis": {"major_label_orientation": "horizontal"},
+            "Legend": {
+                "spacing": 8,
+                "glyph_width": 15,
+                "label_standoff": 8,
+                "label_text_color": s.dark,
+                "label_text_font_size": label,
+                "border_line_alpha": 1,
+                "border_line_color": s.light,
+                "background_fill_alpha": 0.25,
+                "background_fill_color": s.empty,
+            },
+            "ColorBar": {
+                "title_text_color": s.darkest,
+                "title_text_font": font,
+                "title_text_font_size": label,
+                "background_fill_color": s.empty,
+                "bar_line_alpha": 0,
+                "major_label_text_color": s.dark,
+                "major_label_text_font": font,
+                "major_label_text_font_size": label,
+                "major_tick_line_alpha": 0,
+            },
+            "Line": {"line_width": sizes.bokeh_line,},
+        }
+    }
+
+
+def color_values(colors: Tuple[str, ...], n: int = 16) -> list:
+    """n evenly spaced colors from a palette, indexed like a Matplotlib colormap."""
+    # more values is closer to the original LCH space, but more data
+    idx = np.minimum((np.linspace(0, 1, n) * len(colors)).astype(int), len(colors) - 1)
+    return [colors[i] for i in idx]
+
+
+def vega_theme(tokens: ThemeTokens) -> Dict:
+    """Vega-Lite config."""
+    s = tokens.shades
+    sizes = tokens.sizes
+    return {
+        "config": {
+            "background": s.empty,
+            "numberFormat": ".5~r",
+            "range": {
+                "category": list(tokens.colors),
+                "heatmap": color_values(tokens.wide_heatmap),
+                "diverging": color_values(tokens.diverging),
+                "ramp": color_values(tokens.ramp),
+            },
+            "circle": {"size": sizes.mark_area, "fill": tokens.colors[0],},
+            "square": {"size": sizes.mark_area, "fill": tokens.colors[0],},
+            "line": {"strokeWidth": sizes.web_line,},
+            "style": {
+                "guide-label": {
+                    "fill": s.dark,
+                    "fontWeight": sizes.label_weight,
+                    "fontSize": sizes.label,
+                },
+                "guide-title": {
+                    "fill": s.darkest,
+                    "fontSize": sizes.axis_title,
+                    "fontWeight": sizes.title_weight,
+                },
+                "group-title": {
+                    "fill": s.darkest,
+                    "fontSize": sizes.title,
+                    "fontWeight": sizes.figure_title_weight,
+                },
+            },
+            "axis": {
+                "tickFontWeight": sizes.tick_weight,
+                "tickColor": s.dark,
+                "domainColor": s.dark,
+            },
+            "axisY": {"titleAngle": 0, "titleAlign": "right"},
+            "axisXBand": {"labelAngle": -45},
+            "axisQuantitative": {"grid": False},
+            "legend": {
+                "labelColor": s.darkest,
+                "gradientHorizontalMinLength": 200,
+                "gradientHorizontalMaxLength": 1000,
+                "gradientVerticalMinLength": 200,
+                "gradientVerticalMaxLength": 1000,
+            },
+            "view": {"background": s.empty, "stroke": "transparent",},
+        }
+    }
@@ -0,0 +1,314 @@
+"""Out-of-core heatmap rendering: colors 2D fields that don't fit in memory with rho palettes,
+writing a PNG or a pyramid of zoom tiles while only holding a band of rows at a time."""
+
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from pathlib import Path
+import struct
+import tempfile
+from typing import Iterable, Optional, Tuple, Union
+import zlib
+
+import matplotlib as mpl
+import numpy as np
+
+from .palettes import SequentialPalette, SequentialPaletteMixin
+from .sequential_palettes import SEQUENTIAL
+
+PaletteLike = Union[str, SequentialPaletteMixin]
+
+TILE_ROWS = 256
+TILE_SIZE = 256
+
+
+def resolve_palette(palette: PaletteLike) -> SequentialPaletteMixin:
+    """Looks up a palette by name: rho palettes with or without the rho_ prefix (e.g., lava or
+    rho_heatmap), falling back to registered Matplotlib colormaps."""
+    if isinstance(palette, SequentialPaletteMixin):
+        return palette
+    for name in (palette, palette[4:] if palette.startswith("rho_") else palette):
+        if name in SEQUENTIAL and not name.startswith(("mpl_", "list_")):
+            return SEQUENTIAL[name]
+    if palette in mpl.colormaps:
+        return SequentialPalette.from_mpl_cmap(mpl.colormaps[palette])
+    raise KeyError(f"Unknown palette {palette}")
+
+
+def open_field(source) -> np.ndarray:
+    """Opens a 2D field: a path to a .npy file is memory-mapped, and arrays are used as-is."""
+    if isinstance(source, (str, os.PathLike)):
+        field = np.load(source, mmap_mode="r")
+    else:
+        field = np.asarray(source) if not isinstance(source, np.memmap) else source
+    if field.ndim != 2:
+        raise ValueError(f"Expected a 2D field, got shape {field.shape}")
+    return field
+
+
+def _bands(n_rows: int, tile_rows: int) -> Iterable[Tuple[int, int]]:
+    for start in range(0, n_rows, tile_rows):
+        yield start, min(start + tile_rows, n_rows)
+
+
+def field_range(source, norm: str = "linear", tile_rows: int = TILE_ROWS) -> Tuple[float, float]:
+    """Computes the minimum and maximum finite values of a field in one streaming pass. With a
+    log norm, only positive values count."""
+    field = open_field(source)
+    lo, hi = np.inf, -np.inf
+    for start, end in _bands(field.shape[0], tile_rows):
+        band = np.asarray(field[start:end])
+        keep = np.isfinite(band)
+        if norm == "log":
+            keep &= band > 0
+        band = band[keep]
+        if band.size:
+            lo, hi = min(lo, band.min()), max(hi, band.max())
+    if lo > hi:
+        raise ValueError("Field has no finite values to normalize")
+    return float(lo), float(hi)
+
+
+class _FieldRef:
+    """Picklable reference to a C-contiguous memory-mapped field, so worker processes can
+    reopen it instead of receiving copies of the data."""
+
+    def __init__(self, field: np.memmap, offset: int):
+        self.filename = field.filename
+        self.offset = offset
+        self.dtype = field.dtype
+        self.shape = field.shape
+
+    def open(self) -> np.memmap:
+        return np.memmap(self.filename, self.dtype, "r", self.offset, self.shape)
+
+
+def _file_offset(field: np.memmap) -> Optional[int]:
+    """Where a memory-mapped field starts in its file. Views of a memmap keep the offset of the
+    array mapping the file, so this adds how far into that array the view starts."""
+    root = field
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root, np.memmap):
+        return None
+    return field.offset + (field.ctypes.data - root.ctypes.data)
+
+
+def _window(field, rows: slice, cols: slice):
+    """A window of the field, or what to send to a worker to get it."""
+    if isinstance(field, np.memmap) and field.filename is not None and field.flags.c_contiguous:
+        offset = _file_offset(field)
+        if offset is not None:
+            return _FieldRef(field, offset), rows, cols
+    # otherwise, e.g. for a strided view, the worker can't reopen it, so send a copy
+    return np.array(field[rows, cols]), slice(None), slice(None)
+
+
+def _colorize(window, palette, vmin, vmax, norm, linthresh, out=None) -> np.ndarray:
+    data, rows, cols = window
+    if isinstance(data, _FieldRef):
+        data = data.open()
+    return palette.map(data[rows, cols], vmin, vmax, out=out, norm=norm, linthresh=linthresh)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(path, rows: Iterable[np.ndarray], width: int, height: int, level: int = 6):
+    """Writes an 8-bit RGBA PNG from an iterable of (n, width, 4) uint8 bands of rows, which are
+    compressed as they arrive, so the image never has to be in memory."""
+    compressor = zlib.compressobj(level)
+    filtered = None
+    n_rows = 0
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        for band in rows:
+            if band.shape[1:] != (width, 4):
+                raise ValueError(f"Expected bands of shape (n, {width}, 4), got {band.shape}")
+            # each scanline starts with a filter type byte, 0 for no filter
+            if filtered is None or filtered.shape[0] != band.shape[0]:
+                filtered = np.zeros((band.shape[0], width * 4 + 1), dtype=np.uint8)
+            filtered[:, 1:] = band.reshape(band.shape[0], -1)
+            n_rows += band.shape[0]
+            data = compressor.compress(filtered.tobytes())
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+        if n_rows != height:
+            raise ValueError(f"Got {n_rows} rows, expected {height}")
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _bounded_map(executor, func, args: Iterable[tuple], max_pending: int):
+    """Like executor.map, but only submits max_pending tasks ahead of the results consumed, so
+    finished results don't pile up in memory."""
+    pending = []
+    for arg in args:
+        pending.append(executor.submit(func, *arg))
+        if len(pending) >= max_pending:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def _resolve_range(field, vmin, vmax, norm, tile_rows):
+    if vmin is None or vmax is None:
+        lo, hi = field_range(field, norm, tile_rows)
+        vmin, vmax = (lo if vmin is None else vmin), (hi if vmax is None else vmax)
+    return vmin, vmax
+
+
+def _pool_size(processes: int) -> int:
+    return processes or os.cpu_count() or 1
+
+
+def render_png(
+    source,
+    path,
+    palette: PaletteLike = "lava",
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    norm: str = "linear",
+    linthresh: float = 1,
+    tile_rows: int = TILE_ROWS,
+    processes: Optional[int] = None,
+):
+    """Renders a 2D field (an array, np.memmap, or path to a .npy file) to a PNG, tile_rows rows
+    at a time. Missing vmin and vmax are computed in a streaming first pass, and norm and
+    linthresh are as in SequentialPaletteMixin.map.
+
+    If processes is not None, bands are colored in a pool of that many processes (0 for one per
+    CPU): memory-mapped fields are reopened by the workers, and other arrays are sent band by
+    band."""
+    field = open_field(source)
+    palette = resolve_palette(palette)
+    vmin, vmax = _resolve_range(field, vmin, vmax, norm, tile_rows)
+    height, width = field.shape
+
+    if processes is None:
+        buffer = np.empty((min(tile_rows, height), width, 4), dtype=np.uint8)
+        bands = (
+            _colorize(
+                (field, slice(start, end), slice(None)),
+                palette, vmin, vmax, norm, linthresh,
+                out=buffer[: end - start],
+            )
+            for start, end in _bands(height, tile_rows)
+        )
+        write_png(path, bands, width, height)
+        return
+
+    args = (
+        (_window(field, slice(start, end), slice(None)), palette, vmin, vmax, norm, linthresh)
+        for start, end in _bands(height, tile_rows)
+    )
+    n_workers = _pool_size(processes)
+    with ProcessPoolExecutor(n_workers) as executor:
+        write_png(path, _bounded_map(executor, _colorize, args, 2 * n_workers), width, height)
+
+
+def downsample(field, out, tile_rows: int = TILE_ROWS) -> np.ndarray:
+    """Halves a field's resolution into out, averaging 2x2 blocks and ignoring NaN, which only
+    shows up in the output if a whole block is NaN. Odd sizes round up, so out should have
+    shape (ceil(height / 2), ceil(width / 2))."""
+    height, width = field.shape
+    out_width = out.shape[1]
+    for start, end in _bands(out.shape[0], tile_rows):
+        block = np.full((2 * (end - start), 2 * out_width), np.nan, dtype=out.dtype)
+        rows = field[2 * start : min(2 * end, height)]
+        block[: rows.shape[0], :width] = rows
+        block = block.reshape(end - start, 2, out_width, 2)
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=(1, 3))
+        sums = np.where(valid, block, 0).sum(axis=(1, 3))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[start:end] = sums / counts
+    return out
+
+
+def _render_tile(window, palette, vmin, vmax, norm, linthresh, path, tile_size):
+    colors = _colorize(window, palette, vmin, vmax, norm, linthresh)
+    # partial tiles at the edges are padded with transparency
+    tile = np.zeros((tile_size, tile_size, 4), dtype=np.uint8)
+    tile[: colors.shape[0], : colors.shape[1]] = colors
+    write_png(path, [tile], tile_size, tile_size)
+    return path
+
+
+def render_tiles(
+    source,
+    directory,
+    palette: PaletteLike = "lava",
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    norm: str = "linear",
+    linthresh: float = 1,
+    tile_size: int = TILE_SIZE,
+    tile_rows: int = TILE_ROWS,
+    processes: Optional[int] = None,
+) -> int:
+    """Renders a 2D field to a pyramid of tile_size square PNG tiles in directory/z/x/y.png, the
+    usual layout for web maps. The highest zoom level is the field at full resolution, and each
+    level below halves it, down to level 0, which fits in one tile. The lower levels are
+    downsampled from the one above into temporary memory-mapped files, so memory use stays
+    bounded. Returns the highest zoom level.
+
+    The other arguments are as in render_png, with processes coloring and writing tiles in
+    parallel."""
+    field = open_field(source)
+    palette = resolve_palette(palette)
+    vmin, vmax = _resolve_range(field, vmin, vmax, norm, tile_rows)
+    max_zoom = max(0, math.ceil(math.log2(max(field.shape) / tile_size)))
+    dtype = np.result_type(field.dtype, np.float32)
+
+    n_workers = None if processes is None else _pool_size(processes)
+    executor = None if processes is None else ProcessPoolExecutor(n_workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            level = field
+            for zoom in range(max_zoom, -1, -1):
+                if zoom < max_zoom:
+                    shape = tuple((n + 1) // 2 for n in level.shape)
+                    out = np.lib.format.open_memmap(
+                        Path(tmp) / f"{zoom}.npy", "w+", dtype=dtype, shape=shape
+                    )
+                    level = downsample(level, out, tile_rows)
+                    level.flush()
+                _render_level(level, zoom, Path(directory), palette, vmin, vmax, norm,
+                              linthresh, tile_size, executor, n_workers)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return max_zoom
+
+
+def _render_level(level, zoom, directory, palette, vmin, vmax, norm, linthresh, tile_size,
+                  executor, n_workers):
+    height, width = level.shape
+    n_x, n_y = math.ceil(width / tile_size), math.ceil(height / tile_size)
+    for x in range(n_x):
+        (directory / str(zoom) / str(x)).mkdir(parents=True, exist_ok=True)
+
+    # row by row, so reads from the memory-mapped levels are mostly sequential
+    args = (
+        (
+            _window(
+                level,
+                slice(y * tile_size, (y + 1) * tile_size),
+                slice(x * tile_size, (x + 1) * tile_size),
+            ),
+            palette, vmin, vmax, norm, linthresh,
+            directory / str(zoom) / str(x) / f"{y}.png",
+            tile_size,
+        )
+        for y in range(n_y)
+        for x in range(n_x)
+    )
+    if executor is None:
+        for arg in args:
+            _render_tile(*arg)
+    else:
+        for _ in _bounded_map(executor, _render_tile, args, 2 * n_workers):
+            pass
@@ -1,18 +1,222 @@
 #!/usr/bin/env python3
 """General utilities."""
 
+import ast
+import heapq
+import io
 import re
+import tokenize
 from typing import Iterable, Union
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib import colors as mpl_colors
 import inspect
+import weakref
 
-from functools import wraps
+from functools import lru_cache, wraps
 
 DATA_KW_NAMES = ['data', 'data_frame']
+
+# original function -> its expression wrapper, so each original is only wrapped once
+_WRAPPERS = {}
+# callable -> whether it takes a data argument
+_TAKES_DATA = {}
+# module or class -> {attribute: (original value in its __dict__, or None if inherited)}
+_DECORATED = weakref.WeakKeyDictionary()
+
+
+# functions pandas.eval supports, for expressions simple enough to run as Python code
+EXPR_FUNCS = {
+    name: getattr(np, name)
+    for name in (
+        'sin', 'cos', 'tan', 'exp', 'log', 'expm1', 'log1p', 'sqrt', 'sinh', 'cosh', 'tanh',
+        'arcsin', 'arccos', 'arctan', 'arccosh', 'arcsinh', 'arctanh', 'abs', 'arctan2', 'log10',
+    )
+}
+_SIMPLE_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load,
+    ast.Constant, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd, ast.Invert, ast.BoolOp, ast.And, ast.Or, ast.Lt, ast.LtE, ast.Gt,
+    ast.GtE, ast.Eq, ast.NotEq,
+)
+_TOKEN_RE = re.compile(r"`[^`]*`|[^\W\d]\w*")
+
+
+@lru_cache(maxsize=4096)
+def _names(arg: str) -> frozenset:
+    """The identifiers and backtick-quoted names in an expression."""
+    return frozenset(tok[1:-1] if tok.startswith('`') else tok for tok in _TOKEN_RE.findall(arg))
+
+
+def is_expression(arg, columns: set) -> bool:
+    """Whether arg is an expression using columns, rather than a column name or other value."""
+    if not isinstance(arg, str) or arg in columns:
+        return False
+    return not columns.isdisjoint(_names(arg))
+
+
+def _pandas_booleans(source: str) -> str:
+    """Replaces & and | with and and or, like pandas.eval does, so they bind less tightly than
+    comparisons."""
+    tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+    return tokenize.untokenize(
+        (tok.type, {'&': ' and ', '|': ' or '}.get(tok.string, tok.string) if tok.type == tokenize.OP
+         else tok.string)
+        for tok in tokens
+    )
+
+
+class _ElementwiseBooleans(ast.NodeTransformer):
+    """Rewrites and, or, and chained comparisons to the elementwise & and | pandas.eval means."""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        out = node.values[0]
+        for value in node.values[1:]:
+            out = ast.BinOp(out, op, value)
+        return out
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left, *node.comparators]
+        out = None
+        for left, op, right in zip(operands, node.ops, operands[1:]):
+            compare = ast.Compare(left, [op], [right])
+            out = compare if out is None else ast.BinOp(out, ast.BitAnd(), compare)
+        return out
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expr: str, columns: frozenset):
+    """Compiles an expression that only uses columns, numbers, strings, arithmetic, comparisons,
+    &, |, and the functions pandas.eval knows to Python code with the same meaning as in
+    pandas.eval, returning (code, {variable: column}). For anything else, returns None, meaning
+    it should go through pandas.eval."""
+    variables = {}
+
+    def quote(match):
+        variables[f'__col_{len(variables)}'] = match.group(0)[1:-1]
+        return f'__col_{len(variables) - 1}'
+
+    try:
+        source = _pandas_booleans(re.sub(r"`[^`]*`", quote, expr.strip()))
+        tree = ast.parse(source.strip(), mode='eval')
+    except (SyntaxError, tokenize.TokenError, IndentationError):
+        return None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _SIMPLE_NODES):
+            return None
+        if isinstance(node, ast.Call):
+            if node.keywords or not (isinstance(node.func, ast.Name) and node.func.id in EXPR_FUNCS):
+                return None
+        elif isinstance(node, ast.Name) and node.id not in variables:
+            if node.id in columns:
+                variables[node.id] = node.id
+            elif node.id not in EXPR_FUNCS:
+                return None
+    if not all(col in columns for col in variables.values()):
+        return None
+    tree = ast.fix_missing_locations(_ElementwiseBooleans().visit(tree))
+    return compile(tree, expr, 'eval'), variables
+
+
+def eval_expression(data, expr: str, columns: set):
+    """Evaluates an expression on a DataFrame, as Python code on its columns if it's simple enough
+    and with data.eval otherwise."""
+    used = frozenset(columns.intersection(_names(expr)))
+    compiled = compile_expression(expr, used)
+    if compiled is None:
+        return data.eval(expr)
+    code, variables = compiled
+    namespace = {var: data[col] for var, col in variables.items()}
+    return eval(code, {'__builtins__': {}, **EXPR_FUNCS}, namespace)
+
+
+def frame_kind(data):
+    """'pandas', 'polars', or 'pyarrow' for the tables expressions work on, or None."""
+    if data is None:
+        return None
+    if all(hasattr(data, attr) for attr in ('assign', 'columns')):
+        return 'pandas'
+    # checking the module avoids importing Polars or PyArrow just to use isinstance
+    module = type(data).__module__.split('.')[0]
+    if module == 'polars' and hasattr(data, 'columns') and hasattr(data, 'get_column'):
+        return 'polars'
+    if module == 'pyarrow' and hasattr(data, 'column_names'):
+        return 'pyarrow'
+    return None
+
+
+def _column_args(values, columns: set) -> list:
+    """The column names among arguments, including inside lists like Plotly's hover_data."""
+    used = {}
+    for value in values:
+        for item in (value if isinstance(value, (list, tuple)) else (value,)):
+            if isinstance(item, str) and item in columns:
+                used[item] = None
+    return list(used)
+
+
+def _polars_expr(expr: str, columns: set):
+    """Converts an expression to a Polars expression, with the same meaning as in pandas.eval."""
+    import polars as pl
+
+    compiled = compile_expression(expr, frozenset(columns.intersection(_names(expr))))
+    if compiled is None:
+        raise ValueError(
+            f"Can't evaluate {expr!r} on a Polars DataFrame: expressions on Polars can only use "
+            "columns, numbers, strings, arithmetic, comparisons, &, |, ~, and NumPy functions "
+            f"like {', '.join(list(EXPR_FUNCS)[:3])}"
+        )
+    code, variables = compiled
+    # NumPy functions dispatch to Polars expressions
+    namespace = {var: pl.col(col) for var, col in variables.items()}
+    return eval(code, {'__builtins__': {}, **EXPR_FUNCS}, namespace)
+
+
+def native_columns(data, kind: str, used: list, exprs: list, columns: set) -> dict:
+    """Evaluates expressions on a Polars or PyArrow table, returning a dict of NumPy arrays with
+    the used columns (views of the table's memory where possible) and the expressions.
+
+    Polars evaluates the expressions together in one lazy query, so they have to be simple
+    enough for compile_expression, and raise ValueError otherwise. For PyArrow, the columns go
+    through the same compiled expressions as NumPy arrays, with pandas.eval as the fallback."""
+    if kind == 'polars':
+        out = {col: data.get_column(col).to_numpy() for col in used}
+        results = data.lazy().select([_polars_expr(e, columns).alias(e) for e in exprs]).collect()
+        out.update({e: results.get_column(e).to_numpy() for e in exprs})
+        return out
+
+    needed = dict.fromkeys(used)
+    for expr in exprs:
+        needed.update(dict.fromkeys(sorted(columns.intersection(_names(expr)))))
+    arrays = {col: data.column(col).to_numpy(zero_copy_only=False) for col in needed}
+    out = {col: arrays[col] for col in used}
+    for expr in exprs:
+        compiled = compile_expression(expr, frozenset(columns.intersection(_names(expr))))
+        if compiled is None:
+            import pandas as pd
+
+            out[expr] = pd.DataFrame(arrays, copy=False).eval(expr).to_numpy()
+        else:
+            code, variables = compiled
+            namespace = {var: arrays[col] for var, col in variables.items()}
+            out[expr] = np.asarray(eval(code, {'__builtins__': {}, **EXPR_FUNCS}, namespace))
+    return out
+
+
 def allow_expression_column(func):
-    """Wraps matplotlib/seaborn/plotly functions to allow expressions instead of just column names."""
+    """Wraps matplotlib/seaborn/plotly functions to allow expressions instead of just column names.
+    Works on pandas DataFrames, and on Polars DataFrames and PyArrow tables, which are passed on
+    as a dict of NumPy arrays with only the columns used. Wrapping a wrapper returns it unchanged, and each function is only wrapped once."""
+    if hasattr(func, '__rho_original__'):
+        return func
+    try:
+        return _WRAPPERS[func]
+    except (KeyError, TypeError):
+        pass
+
     @wraps(func)
     def wrap(*args, **kwargs):
         new_kwargs = kwargs.copy()
@@ -30,48 +234,88 @@ def allow_expression_column(func):
             new_args = new_args[1:]
             data_arg_type = 'positional'
 
-        if data is None or not all(hasattr(data, attr) for attr in ('assign', 'columns')):
+        kind = frame_kind(data)
+        if kind is None:
             # data argument wasn't passed in, just pass to inner function unchanged
             return func(*args, **kwargs)
 
-        exprs = []
-        def is_expression(arg):
-            if not isinstance(arg, str):
-                return False
-
-            has_column = any(col in arg for col in data.columns)
-            is_not_column = arg not in data.columns
-            return has_column and is_not_column
-        for arg in new_args:
-            if is_expression(arg):
-                exprs.append(arg)
-        for kwarg in new_kwargs.values():
-            if is_expression(kwarg):
-                exprs.append(kwarg)
-
-        assignments = {expr: data.eval(expr) for expr in exprs}
+        columns = set(data.columns if kind != 'pyarrow' else data.column_names)
+        exprs = [
+            arg for arg in (*new_args, *new_kwargs.values())
+            if is_expression(arg, columns)
+        ]
+        if not exprs:
+            return func(*args, **kwargs)
+
+        if kind == 'pandas':
+            # a shallow copy shares the data, so adding the expression columns doesn't copy the
+            # frame
+            data = data.copy(deep=False)
+            for expr in dict.fromkeys(exprs):
+                data[expr] = eval_expression(data, expr, columns)
+        else:
+            used = _column_args((*new_args, *new_kwargs.values()), columns)
+            data = native_columns(data, kind, used, list(dict.fromkeys(exprs)), columns)
         if data_arg_type == 'positional':
-            new_args = [data.assign(**assignments), *new_args]
+            new_args = [data, *new_args]
         else:
-            new_kwargs[data_arg_type] = data.assign(**assignments)
+            new_kwargs[data_arg_type] = data
         return func(*new_args, **new_kwargs)
 
+    wrap.__rho_original__ = func
+    try:
+        _WRAPPERS[func] = wrap
+    except TypeError:
+        # unhashable callable
+        pass
     return wrap
 
 
+def _takes_data(fun) -> bool:
+    """Whether a callable has a data or data_frame argument, caching the signature check."""
+    try:
+        return _TAKES_DATA[fun]
+    except KeyError:
+        pass
+    except TypeError:
+        # unhashable, so can't cache
+        return False
+
+    try:
+        sig = inspect.signature(fun)
+        takes_data = any(arg in sig.parameters for arg in DATA_KW_NAMES)
+    except (TypeError, ValueError):
+        # not a function, or can't get signature
+        takes_data = False
+    _TAKES_DATA[fun] = takes_data
+    return takes_data
+
+
 def decorate_all(module):
     """Wraps any function in a module that supports data or data_frame arguments
-    to support expressions."""
+    to support expressions. Calling this again doesn't wrap anything twice, and undecorate
+    reverses it."""
+    decorated = _DECORATED.setdefault(module, {})
+    own = vars(module)
     # never change, Python
     for attr in dir(module):
+        if attr in decorated:
+            continue
         fun = getattr(module, attr)
-        try:
-            sig = inspect.signature(fun)
-            if any(arg in sig.parameters for arg in DATA_KW_NAMES):
-                setattr(module, attr, allow_expression_column(fun))
-        except (TypeError, ValueError):
-            # not a function, or can't get signature
-            pass
+        if hasattr(fun, '__rho_original__') or not _takes_data(fun):
+            continue
+        decorated[attr] = own.get(attr)
+        setattr(module, attr, allow_expression_column(fun))
+
+
+def undecorate(module):
+    """Restores the functions decorate_all wrapped in a module or class."""
+    for attr, original in _DECORATED.pop(module, {}).items():
+        if original is None:
+            # was inherited, so just remove the override
+            delattr(module, attr)
+        else:
+            setattr(module, attr, original)
 
 
 def pd_unique(arr):
@@ -100,134 +344,159 @@ def is_curr_dark_bokeh():
     r, g, b = mpl_colors.to_rgb(bgcolor)
     return (0.2 * r + 0.6 * g + 0.2 * b) <= 0.5
 
-def spread(x, margin):
-    x = np.array(x, copy=False).astype(np.float64)
-    if len(x) <= 1:
-        return x
-
-    # # we need to work on sorted x, but we also need to remember the indices so we can adjust the right ones
-    sort_inds = np.argsort(x)
-    x_sort = x.copy()[sort_inds]
-
+def _isotonic_weights(weights, shape) -> np.ndarray:
+    """Broadcasts the weights to shape, checking that they're nonnegative."""
+    weights = np.asarray(1.0 if weights is None else weights, dtype=np.float64)
+    weights = np.broadcast_to(weights, shape)
+    # also catches NaN
+    if not np.all(weights >= 0):
+        raise ValueError("weights should be nonnegative")
+    return weights
+
+
+def _pool_zero_weights(fit, y, weights) -> np.ndarray:
+    """Fits only the points with positive weight, because points with zero weight don't change
+    the loss, and pools each of the others with the closest positive point before it (or after
+    it, at the start). If every weight is zero, the points are weighted equally."""
+    positive = np.flatnonzero(weights > 0)
+    if len(positive) == 0:
+        return fit(y)
+    fitted = fit(y[positive], weights[positive])
+    pooled = np.searchsorted(positive, np.arange(len(y)), side='right') - 1
+    return fitted[np.maximum(pooled, 0)]
+
+
+def isotonic_mean(y, weights=None) -> np.ndarray:
+    """The nondecreasing sequence closest to y in weighted squared distance, by pool adjacent
+    violators: a stack of blocks, each fit by its weighted mean, where a new block merges with
+    the ones before it until their means are in order. O(n)."""
+    y = np.asarray(y, dtype=np.float64)
+    weights = _isotonic_weights(weights, y.shape)
+    if not np.all(weights > 0):
+        return _pool_zero_weights(isotonic_mean, y, weights)
+    means, totals, counts = [], [], []
+    for mean, total in zip(y.tolist(), weights.tolist()):
+        count = 1
+        while means and means[-1] > mean:
+            prev_total = totals.pop()
+            mean = (means.pop() * prev_total + mean * total) / (prev_total + total)
+            total += prev_total
+            count += counts.pop()
+        means.append(mean)
+        totals.append(total)
+        counts.append(count)
+    return np.repeat(means, counts)
+
+
+class _MedianBlock:
+    """Values with weights that can be merged, tracking their weighted (lower) median with a
+    max-heap of the values up to the median and a min-heap of those above it."""
+
+    def __init__(self, value, weight):
+        self.below = [(-value, weight)]
+        self.above = []
+        self.w_below = weight
+        self.w_above = 0.0
+        self.count = 1
+
+    @property
+    def median(self):
+        return -self.below[0][0]
+
+    def push(self, value, weight):
+        if value <= self.median:
+            heapq.heappush(self.below, (-value, weight))
+            self.w_below += weight
+        else:
+            heapq.heappush(self.above, (value, weight))
+            self.w_above += weight
+
+    def merge(self, other: '_MedianBlock') -> '_MedianBlock':
+        """Merges the smaller block into the larger one, and returns the larger one."""
+        big, small = (self, other) if self.count >= other.count else (other, self)
+        for neg_value, weight in small.below:
+            big.push(-neg_value, weight)
+        for value, weight in small.above:
+            big.push(value, weight)
+        big.count += small.count
+        big.rebalance()
+        return big
+
+    def rebalance(self):
+        # at least half of the weight is at or below the median, and less without it
+        while self.w_below < self.w_above:
+            value, weight = heapq.heappop(self.above)
+            heapq.heappush(self.below, (-value, weight))
+            self.w_below += weight
+            self.w_above -= weight
+        while self.w_below - self.below[0][1] >= self.w_above + self.below[0][1]:
+            neg_value, weight = heapq.heappop(self.below)
+            heapq.heappush(self.above, (-neg_value, weight))
+            self.w_below -= weight
+            self.w_above += weight
+
+
+def isotonic_median(y, weights=None) -> np.ndarray:
+    """The nondecreasing sequence closest to y in weighted absolute distance, by pool adjacent
+    violators with blocks fit by their weighted median. O(n log^2 n)."""
+    y = np.asarray(y, dtype=np.float64)
+    weights = _isotonic_weights(weights, y.shape)
+    if not np.all(weights > 0):
+        return _pool_zero_weights(isotonic_median, y, weights)
+    blocks = []
+    for value, weight in zip(y.tolist(), weights.tolist()):
+        block = _MedianBlock(value, weight)
+        while blocks and blocks[-1].median > block.median:
+            block = blocks.pop().merge(block)
+        blocks.append(block)
+    return np.repeat([block.median for block in blocks], [block.count for block in blocks])
+
+
+ISOTONIC = {'squared': isotonic_mean, 'absolute': isotonic_median}
+
+
+def spread(x, margin, weights=None, lower=None, upper=None, loss='squared'):
+    """Moves points on a line as little as possible so that each point is at least its margin
+    plus its neighbor's margin away from its neighbors: e.g., label centers, where margin is half
+    the label height. Points keep their order, with ties broken by position in x.
+
+    Movement is measured by loss, 'squared' (the default) or 'absolute' distance, with each
+    point's movement multiplied by its weight, so points with larger weights move less. Weights
+    must be nonnegative, and points with zero weight move with their neighbors. If lower
+    or upper are given, points are also kept at least their margin inside them: if the points
+    don't fit, upper wins. O(n log n) for squared loss, O(n log^2 n) for absolute loss.
+
+    Minimizing the Total Movement for Movement to Independence Problem on a Line
+    Ghadiri, Yazdanbod 2016
+    https://www.researchgate.net/publication/304641457_Minimizing_the_Total_Movement_for_Movement_to_Independence_Problem_on_a_Line
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if loss not in ISOTONIC:
+        raise ValueError(f"loss should be one of {list(ISOTONIC)}, not {loss!r}")
+    if len(x) == 0:
+        return x.copy()
+
+    sort_inds = np.argsort(x, kind='stable')
+    x_sort = x[sort_inds]
     margin = np.broadcast_to(margin, x.shape)[sort_inds]
+    if weights is not None:
+        weights = np.broadcast_to(weights, x.shape)[sort_inds]
 
-    # Minimizing the Total Movement for Movement to Independence Problem on a Line
-    # Ghadiri, Yazdanbod 2016
-    # https://www.researchgate.net/publication/304641457_Minimizing_the_Total_Movement_for_Movement_to_Independence_Problem_on_a_Line
-    # this function does things a little differently, which I think results in clearer code
-
-    gap_dmin = np.concatenate([[0], (margin[1:] + margin[:-1]), [0]])
-
+    # offset[i] is the closest point i can be to point 0, so the spread points are
+    # z + offset for nondecreasing z, and the best z is an isotonic regression
+    offset = np.concatenate([[0], np.cumsum(margin[1:] + margin[:-1])])
+    z = ISOTONIC[loss](x_sort - offset, weights)
 
-    slack = np.zeros_like(x_sort, dtype=np.float64)
-    adj = np.zeros_like(x_sort, dtype=np.float64)
-    for i in range(1, len(x_sort)):
-        # previous element's new location is x_sort[i-1] + adj[i-1]
-        # move to max(x_sort[i], prev + dmin)
+    # the bounds on z are monotone, so clipping the unbounded fit to them is optimal
+    if lower is not None:
+        z = np.maximum(z, np.maximum.accumulate(lower + margin - offset))
+    if upper is not None:
+        z = np.minimum(z, np.minimum.accumulate((upper - margin - offset)[::-1])[::-1])
 
-        # dmin = max(dmin[i], dmin[i-1])
+    out = np.empty_like(z)
+    out[sort_inds] = z + offset
+    return out
 
-        # local_dmin = dmin[i] + dmin[i - 1]
-        local_dmin = gap_dmin[i]
-        prev = x_sort[i - 1] + adj[i - 1]
-        new_x = max(x_sort[i], prev + local_dmin)
-        slack[i] = new_x - (prev + local_dmin)
-        adj[i] = new_x - x_sort[i]
-
-    new_x = x_sort.copy()
-    chains = np.ones_like(new_x)
-
-    for i in range(1, len(new_x)):
-        if slack[i] == 0:
-            chains[i] = chains[i - 1]
-        else:
-            chains[i] = chains[i - 1] + 1
-
-    # We break the elements into "chains", groups that are all the minimum distance apart.
-    # To start out, we make chains as above, simply checking whether each element is tied
-    # to the one before it (because that can be easily computed)
-
-    # This produces incorrect results when some elements move left, thereby entangling more.
-    # For example, with dmin = 3 the list [0, 4, 5, 6] is actually all connected, because
-    # the chain [4, 5, 6] will become [2, 5, 8] which is within range of 0.
-
-    # To adjust a single chain, we compute the median of the shifts if only rightward shifts
-    # are allowed, and subtract that median from each of the shifts.
-
-    # We repeat the following process until convergence:
-    # - Adjust each chain independently
-    # - If two chains are within the minimum distance of each other, merge them
-
-    def adjust(chains):
-        new_x = x_sort.copy()
-        for c in np.unique(chains):
-            chain_adj = adj[chains == c]
-            # chain_adj -= np.max(chain_adj) / 2
-            chain_adj -= np.mean(chain_adj)
-            # chain_adj -= np.median(chain_adj)
-
-            new_x[chains == c] += chain_adj
-        return new_x
-
-    def detach_chains(chains):
-        # print(chains)
-        for i in range(1, len(chains)):
-            if chains[i] == chains[i - 1]:
-                detached_chains = chains.copy()
-                detached_chains[i] = np.max(detached_chains) + 1
-                # print('detach', i, inds[i:], detached_chains)
-                if not chain_overlaps(detached_chains).any():
-                    # print('success')
-                    return detach_chains(detached_chains)
-        return chains
-
-    def chain_overlaps(chains):
-        adj_x = adjust(chains)
-
-        intervals = []
-        for c in pd_unique(chains):
-            inds = np.nonzero(chains == c)[0]
-            intervals.append(
-                (
-                    adj_x[inds[0]] - gap_dmin[inds[0]],
-                    adj_x[inds[0]],
-                    adj_x[inds[-1]],
-                    adj_x[inds[-1]] + gap_dmin[inds[-1] + 1],
-                )
-            )
-
-        # print(intervals)
-        overlaps = [False]
-        for i in range(1, len(intervals)):
-            (lo1, a1, b1, hi1), (lo2, a2, b2, hi2) = intervals[i - 1], intervals[i]
-            overlaps.append(b1 > lo2 or a2 < hi1)
-            # overlaps.append(hi1 > lo2 or lo2 < hi1)
-
-        return np.array(overlaps)
-
-    overlaps = chain_overlaps(chains)
-    # print(chains)
-    # print(overlaps)
-    while overlaps.any():
-        chain_inds = pd_unique(chains)
-        for i in range(1, len(overlaps)):
-            if overlaps[i]:
-                left, right = chain_inds[i-1:i+1]
-                chains[chains == right] = left
-
-        overlaps = chain_overlaps(chains)
-
-    # print(chains)
-    chains = detach_chains(chains)
-    # print(chains)
-    # print(adjust([1, 1, 1, 1, 1, 1, 1, 1, 1, 3, 2, 2]).round(1))
-    # print(x_sort.round(1))
-    # print(adjust(chains).round(1))
-    # fig2, ax2 = plt.subplots()
-    # for center, m1, m2, c, y in zip(adjust(chains), gap_dmin[:-1], gap_dmin[1:], cs, np.linspace(0.7, 0.9, len(x))):
-    #     ax2.axvspan(center - m1, center + m2, 0, y, fill=False, alpha=1, ec=c, lw=1)
-
-    return adjust(chains)[np.argsort(sort_inds)]
 
 def labelcase(text: Union[str, Iterable[str]]):
     """Converts text to a title case and adds spacing from camel case."""
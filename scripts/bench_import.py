@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Measures the import time of rho_plus.sequential_palettes, and how long it takes to create
+every palette object in it, which is what importing it used to do."""
+
+import re
+import subprocess
+import sys
+
+N_RUNS = 5
+
+
+def run(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time(module):
+    """Import time of module in microseconds, not counting the modules it imports, from
+    -X importtime."""
+    stderr = run(f"import {module}").stderr
+    pattern = r"^import time:\s*(\d+)\s*\|\s*\d+\s*\|\s*" + re.escape(module) + r"\s*$"
+    return int(re.search(pattern, stderr, flags=re.MULTILINE).group(1))
+
+
+def materialize_time():
+    code = (
+        "import time\n"
+        "from rho_plus.sequential_palettes import SEQUENTIAL\n"
+        "start = time.perf_counter()\n"
+        "for key in SEQUENTIAL: SEQUENTIAL[key]\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    return float(run(code).stdout) * 1e6
+
+
+imports = sorted(import_time("rho_plus.sequential_palettes") for _ in range(N_RUNS))
+everything = sorted(materialize_time() for _ in range(N_RUNS))
+print(f"import rho_plus.sequential_palettes (self): {imports[N_RUNS // 2] / 1e3:.1f} ms (median of {N_RUNS})")
+print(f"creating all palette objects:             {everything[N_RUNS // 2] / 1e3:.1f} ms (median of {N_RUNS})")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Compares SequentialPalette.map against calling the Matplotlib colormap on a normalized
+array, in time and peak memory, for a large float32 array."""
+
+import time
+import tracemalloc
+
+import matplotlib.colors as mpl_colors
+import numpy as np
+
+from rho_plus.sequential_palettes import SEQUENTIAL
+
+SHAPE = (4000, 4000)
+N_RUNS = 3
+
+values = np.random.default_rng(0).normal(size=SHAPE).astype(np.float32)
+palette = SEQUENTIAL["lava"]
+cmap = SEQUENTIAL["mpl_lava"]
+
+
+def bench(func):
+    times = []
+    for _ in range(N_RUNS):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return sorted(times)[N_RUNS // 2], peak
+
+
+out = np.empty(SHAPE + (4,), dtype=np.uint8)
+results = {
+    "cmap(norm(x), bytes=True)": bench(lambda: cmap(mpl_colors.Normalize(-3, 3)(values), bytes=True)),
+    "palette.map(x)": bench(lambda: palette.map(values, -3, 3)),
+    "palette.map(x, out=out)": bench(lambda: palette.map(values, -3, 3, out=out)),
+}
+print(f"{SHAPE[0]}x{SHAPE[1]} float32, output is {out.nbytes / 2**20:.0f} MiB")
+for name, (t, peak) in results.items():
+    print(f"{name:28}: {t * 1e3:7.1f} ms, peak {peak / 2**20:6.1f} MiB")
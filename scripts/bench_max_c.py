@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Compares the closed-form gamut boundary in color_util.max_c against the
+per-color spline solver it replaced."""
+
+import time
+
+import numpy as np
+
+from rho_plus.color_util import _max_c_inner, max_c
+
+rng = np.random.default_rng(0)
+
+for n in (100, 1_000, 10_000):
+    ll = rng.random(n)
+    hh = rng.random(n) * 360
+
+    start = time.perf_counter()
+    exact = max_c(ll, hh, exact=True)
+    new_time = time.perf_counter() - start
+
+    # the old solver is slow enough that we only time a sample of it
+    n_old = min(n, 1_000)
+    start = time.perf_counter()
+    old = np.array([_max_c_inner(l, h) for l, h in zip(ll[:n_old], hh[:n_old])])
+    old_time = (time.perf_counter() - start) * n / n_old
+
+    err = np.max(np.abs(old - exact[:n_old]))
+    print(
+        f"n={n:>6}: spline {old_time * 1e3:9.1f} ms, closed form {new_time * 1e3:7.1f} ms "
+        f"({old_time / new_time:6.0f}x), max |diff| {err:.4f}"
+    )
+
+ll = rng.random(100_000)
+hh = rng.random(100_000) * 360
+max_c(ll[:1], hh[:1], exact=False)  # load the table
+start = time.perf_counter()
+max_c(ll, hh, exact=False)
+print(f"n=100000: lookup table {(time.perf_counter() - start) * 1e3:.1f} ms")
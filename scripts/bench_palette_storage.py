@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Compares loading the sequential palette data from the memory-mapped uint8 array against
+parsing the JSON list of hex strings, both in load time and in the memory the process ends up
+using."""
+
+import subprocess
+import sys
+
+N_RUNS = 5
+
+CODE = """
+import resource, time
+from rho_plus import sequential_palettes as sp
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+data = sp.{loader}()
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, after - before)
+"""
+
+
+def run(loader):
+    out = subprocess.run(
+        [sys.executable, "-c", CODE.format(loader=loader)], capture_output=True, text=True, check=True
+    ).stdout
+    elapsed, rss = out.split()
+    return float(elapsed), int(rss)
+
+
+for loader in ("load_binary", "load_json"):
+    results = [run(loader) for _ in range(N_RUNS)]
+    times = sorted(t for t, _ in results)
+    rss = sorted(r for _, r in results)
+    print(
+        f"{loader:12}: {times[N_RUNS // 2] * 1e3:6.2f} ms, "
+        f"+{rss[N_RUNS // 2]} KiB max RSS (median of {N_RUNS})"
+    )
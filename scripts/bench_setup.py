@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Times rho_plus.mpl_setup: the first call, and then toggling between light and dark mode, like
+a dashboard does whenever its color mode changes."""
+
+import time
+
+import matplotlib
+
+matplotlib.use("agg")
+
+import rho_plus
+
+N_TOGGLES = 200
+
+start = time.perf_counter()
+rho_plus.mpl_setup(True)
+first = time.perf_counter() - start
+
+times = []
+for i in range(N_TOGGLES):
+    start = time.perf_counter()
+    rho_plus.mpl_setup(i % 2 == 0)
+    times.append(time.perf_counter() - start)
+times.sort()
+
+print(f"first call:  {first * 1e3:8.2f} ms")
+print(f"toggle:      {times[N_TOGGLES // 2] * 1e3:8.3f} ms (median of {N_TOGGLES})")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Times util.spread, which line_labels uses to place labels, on clustered label positions from
+ten to 100,000 labels, and its weighted, bounded, and absolute-loss variants."""
+
+import time
+
+import numpy as np
+
+from rho_plus.util import spread
+
+N_RUNS = 5
+
+rng = np.random.default_rng(0)
+for n in (10, 100, 1_000, 10_000, 100_000):
+    # clusters of labels, so there are long chains to merge
+    x = np.repeat(rng.uniform(0, n, n // 10 + 1), 10)[:n] + rng.normal(0, 0.1, n)
+    margin = rng.uniform(0.5, 1.5, n)
+    times = []
+    for _ in range(N_RUNS):
+        start = time.perf_counter()
+        spread(x, margin)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"{n:7} labels: {times[N_RUNS // 2] * 1e3:9.3f} ms (median of {N_RUNS})")
+
+print()
+x = np.repeat(rng.uniform(0, 100_000, 10_001), 10)[:100_000] + rng.normal(0, 0.1, 100_000)
+margin = rng.uniform(0.5, 1.5, 100_000)
+weights = rng.uniform(0.5, 2, 100_000)
+for name, kwargs in [
+    ("weighted", dict(weights=weights)),
+    ("bounded", dict(lower=0, upper=300_000)),
+    ("absolute", dict(loss="absolute")),
+    ("weighted absolute", dict(weights=weights, loss="absolute")),
+]:
+    start = time.perf_counter()
+    spread(x, margin, **kwargs)
+    print(f"{name:>17}: {(time.perf_counter() - start) * 1e3:9.3f} ms (100000 labels)")
@@ -4,9 +4,11 @@ dependencies.
 
 See the showcase for explanations of when using each palette is appropriate.
 """
+from rho_plus.color_util import to_rgb_arr
 from rho_plus.oklch_palettes import OklchPalette
 from rho_plus.palettes import SequentialPaletteMixin
 import json
+import numpy as np
 from pathlib import Path
 
 
@@ -143,7 +145,16 @@ json_obj = {}
 for key in sorted(SEQUENTIAL):
     json_obj[globals()[key].name()] = list(globals()[key].hex_colors())
 
-with open(Path.cwd() / "rho_plus" / "data" / "sequential_palettes.json", "w") as f:
+data_dir = Path.cwd() / "rho_plus" / "data"
+with open(data_dir / "sequential_palettes.json", "w") as f:
     json.dump(json_obj, f, indent=2)
 
+# compact binary version: an (N, 256, 3) uint8 array, with the names in the same order
+with open(data_dir / "sequential_palettes_index.json", "w") as f:
+    json.dump(list(json_obj), f)
+np.save(
+    data_dir / "sequential_palettes.npy",
+    np.stack([np.rint(to_rgb_arr(colors) * 255).astype(np.uint8) for colors in json_obj.values()]),
+)
+
 print("Done!")
@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
 
-import json
 from pathlib import Path
-from rho_plus import vega_rho_dark, vega_rho_light
 
-for theme, name in zip((vega_rho_dark, vega_rho_light), ("rho_dark", "rho_light")):
-    with open(Path.cwd() / "rho_plus" / "data" / f"vega_{name}.json", "w") as f:
-        json.dump(theme, f, indent=2)
+from rho_plus.compiled_themes import write_themes
+from rho_plus.vega import rho
+
+themes = {name: rho(is_dark)() for name, is_dark in (("rho_dark", True), ("rho_light", False))}
+write_themes("vega", themes, Path.cwd() / "rho_plus" / "data")
 
 print("Done!")
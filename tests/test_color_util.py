@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+import tracemalloc
+
+import matplotlib as mpl
+
+from rho_plus.color_util import (
+    _max_c_inner,
+    contrast_with,
+    lab2lch,
+    lch2lrgb,
+    lch2rgb,
+    lin2srgb,
+    lrgb2lab,
+    max_c,
+    recolor_image,
+    rgb2lch,
+    srgb2lin,
+    to_rgb_arr,
+)
+
+
+def test_max_c_matches_spline():
+    rng = np.random.default_rng(0)
+    ll = rng.random(100)
+    hh = rng.random(100) * 360
+    old = np.array([_max_c_inner(l, h) for l, h in zip(ll, hh)])
+    assert np.allclose(max_c(ll, hh, exact=True), old, atol=0.03)
+
+
+def test_max_c_on_gamut_boundary():
+    rng = np.random.default_rng(1)
+    ll = rng.uniform(0.05, 0.95, 1000)
+    hh = rng.random(1000) * 360
+    cc = max_c(ll, hh, exact=True)
+    inside = lch2lrgb(np.vstack([ll, cc * (1 - 1e-6), hh]).T)
+    outside = lch2lrgb(np.vstack([ll, cc + 1e-4, hh]).T)
+    assert np.all((inside >= 0) & (inside <= 1))
+    assert np.all(((outside < 0) | (outside > 1)).any(axis=1))
+
+
+def test_max_c_shapes():
+    assert max_c(0.5, 30).shape == ()
+    assert max_c([0, 1], 30).tolist() == [0, 0]
+    assert max_c(np.ones((2, 3)) * 0.5, np.arange(3) * 120).shape == (2, 3)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_max_c_propagates_nan(exact):
+    out = max_c([np.nan, 0.5, np.inf, 0.5], [0, np.nan, 0, 30], exact=exact)
+    assert np.isnan(out[:3]).all() and 0 < out[3] < 0.37
+
+
+def test_max_c_lut_close_to_exact():
+    rng = np.random.default_rng(2)
+    ll = rng.random(10_000)
+    hh = rng.random(10_000) * 360
+    err = np.abs(max_c(ll, hh, exact=False) - max_c(ll, hh, exact=True))
+    assert err.max() <= 0.04
+    assert np.percentile(err, 99) <= 5e-4
+    # exact by default
+    assert np.array_equal(max_c(ll, hh), max_c(ll, hh, exact=True))
+
+
+def test_to_rgb_arr():
+    colors = ["#fff", "#1846b3", "red", "C1", "#12345678", "#abcd", "0.5"]
+    assert np.allclose(to_rgb_arr(colors), [mpl.colors.to_rgb(c) for c in colors])
+    assert to_rgb_arr("#1846b3").shape == (3,)
+    assert to_rgb_arr((1, 0, 0, 0.5)).shape == (3,)
+
+    rgba = np.random.default_rng(0).random((10, 4))
+    rgb = to_rgb_arr(rgba)
+    assert rgb.shape == (10, 3)
+    assert np.shares_memory(rgb, rgba)
+
+
+def test_fused_kernels_match_pipeline():
+    rng = np.random.default_rng(3)
+    rgb = rng.random((5000, 3))
+    lch = lab2lch(lrgb2lab(srgb2lin(rgb)))
+    assert np.allclose(rgb2lch(rgb, block_size=1000), lch)
+    assert np.allclose(lch2rgb(lch, block_size=1000), lin2srgb(lch2lrgb(lch)))
+    assert np.allclose(lch2rgb(rgb2lch(rgb)), rgb)
+
+    lch32 = rgb2lch(rgb.astype(np.float32))
+    assert lch32.dtype == np.float32
+    assert np.allclose(lch32[:, :2], lch[:, :2], atol=1e-5)
+
+
+def test_fused_kernels_image_memory():
+    rng = np.random.default_rng(4)
+    img = rng.integers(0, 256, (500, 800, 4), dtype=np.uint8)
+    lch = np.empty((500, 800, 3), dtype=np.float32)
+    out = np.zeros_like(img)
+
+    tracemalloc.start()
+    try:
+        rgb2lch(img[..., :3], out=lch, block_size=4096)
+        lch2rgb(lch, out=out[..., :3], block_size=4096)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # a single full-size float64 copy would be 9.6 MB
+    assert peak < 1_000_000
+    assert np.array_equal(out[..., :3], img[..., :3])
+
+
+def test_recolor_image():
+    rng = np.random.default_rng(5)
+    img = rng.integers(0, 256, (70, 50, 4), dtype=np.uint8)
+    img[0, 0, :3] = 255
+
+    serial = recolor_image(img.copy(), invert=True, tile_rows=7, max_workers=1)
+    threaded = img.copy()
+    out = recolor_image(threaded, invert=True, tile_rows=7, max_workers=4)
+    assert out is threaded
+    assert np.array_equal(serial, threaded)
+    assert np.array_equal(threaded[..., 3], img[..., 3])
+    assert np.array_equal(threaded[0, 0, :3], [0, 0, 0])
+
+    flt = img.astype(np.float32) / 255
+    dim = recolor_image(flt, lightness=(0.2, 0.5), out=np.empty_like(flt))
+    lch = rgb2lch(dim[..., :3])
+    assert lch[:, 0].min() >= 0.2 - 1e-3 and lch[:, 0].max() <= 0.5 + 1e-3
+
+
+def test_int_tuples_are_float_rgb():
+    # Python ints are 0-1 RGB like floats, not image data
+    assert np.allclose(rgb2lch([1, 0, 0]), rgb2lch([1.0, 0.0, 0.0]))
+    assert np.isclose(rgb2lch([1, 0, 0])[0, 0], 0.628, atol=1e-3)
+    assert np.allclose(contrast_with((1, 0, 0), "white"), contrast_with((1.0, 0.0, 0.0), "white"))
+    assert np.allclose(contrast_with([(1, 1, 1), (0, 0, 0)], "black")[0], 1)
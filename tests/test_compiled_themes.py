@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from rho_plus import compiled_themes
+
+
+@pytest.mark.parametrize("backend", ["vega", "plotly"])
+def test_compiled_themes_are_fresh(backend):
+    # if this fails, rerun scripts/write_vega_jsons.py and scripts/write_plotly_jsons.py
+    assert compiled_themes.read_manifest()[backend]["hash"] == compiled_themes.theme_hash(backend)
+
+
+def test_other_backend_versions_are_stale(monkeypatch):
+    manifest = compiled_themes.read_manifest()
+    monkeypatch.setattr(compiled_themes, "backend_version", lambda backend: "0.1")
+    monkeypatch.setattr(compiled_themes, "read_manifest", lambda: manifest)
+    assert not compiled_themes.is_fresh("plotly")
+    assert manifest["vega"]["version"] == ""
+
+
+def test_vega_themes_match_build():
+    pytest.importorskip("altair")
+    from rho_plus import vega
+
+    assert vega.RHO_DARK == vega.rho(True)()
+    assert vega.RHO_LIGHT == vega.rho(False)()
+
+
+def test_plotly_themes_match_build():
+    pytest.importorskip("plotly")
+    import plotly.io as pio
+
+    from rho_plus import plotly
+
+    for name, is_dark in (("rho_dark", True), ("rho_light", False)):
+        loaded = json.dumps(pio.templates[name].to_plotly_json(), sort_keys=True)
+        built = json.dumps(plotly.build_template(is_dark).to_plotly_json(), sort_keys=True)
+        assert loaded == built
+
+
+def test_stale_themes_are_rebuilt(monkeypatch):
+    monkeypatch.setattr(compiled_themes, "read_manifest", lambda: {})
+    assert compiled_themes.load_theme("vega", "rho_dark", lambda: {"rebuilt": True}) == {
+        "rebuilt": True
+    }
+
+
+def test_unreadable_sources_are_stale(monkeypatch):
+    monkeypatch.setattr(
+        compiled_themes, "COMMON_SOURCES", compiled_themes.COMMON_SOURCES + ("missing.py",)
+    )
+    compiled_themes.theme_hash.cache_clear()
+    try:
+        assert compiled_themes.theme_hash("vega") is None
+        assert not compiled_themes.is_fresh("vega")
+        assert compiled_themes.load_theme("vega", "rho_dark", lambda: {"rebuilt": True}) == {
+            "rebuilt": True
+        }
+    finally:
+        compiled_themes.theme_hash.cache_clear()
+
+
+def test_hash_covers_alias_palettes():
+    assert "sequential_palettes.py" in compiled_themes.COMMON_SOURCES
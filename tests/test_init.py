@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+import pytest
+
+import rho_plus
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, matplotlib as mpl\n"
+        # reading the backend rcParam imports pyplot
+        "rc = lambda: {k: mpl.rcParams[k] for k in mpl.rcParams if k != 'backend'}\n"
+        "before = rc()\n"
+        "import rho_plus\n"
+        "heavy = ['matplotlib.pyplot', 'scipy', 'seaborn', 'altair', 'bokeh', 'panel', 'plotly']\n"
+        "print([m for m in heavy if m in sys.modules], rc() == before)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[] True"
+
+
+def test_lazy_attributes():
+    assert rho_plus.mpl_setup is rho_plus.matplotlib.setup
+    assert "scatter_labels" in dir(rho_plus)
+    assert rho_plus.lava.name() == "lava"
+    with pytest.raises(AttributeError):
+        rho_plus.not_a_function
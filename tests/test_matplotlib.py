@@ -0,0 +1,104 @@
+import threading
+import numpy as np
+import pytest
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+
+from rho_plus import matplotlib as rho_mpl
+from rho_plus.sequential_palettes import SEQUENTIAL
+
+
+def test_setup_is_idempotent():
+    light = rho_mpl.rho_light.copy()
+    rho_mpl.setup(False)
+    plot = plt.plot
+    cmap = mpl.colormaps["rho_sequential"]
+
+    rho_mpl.setup(False)
+    assert plt.plot is plot
+    assert mpl.colormaps["rho_sequential"] == cmap
+
+    rho_mpl.setup(True)
+    assert mpl.rcParams["axes.facecolor"].lower() == "#" + rho_mpl.rho_dark["axes.facecolor"].lower()
+    assert mpl.colormaps["rho_heatmap"] == SEQUENTIAL["mpl_candela"]
+    assert plt.plot is plot
+
+    theme, colors = rho_mpl.setup(False)
+    assert mpl.colormaps["rho_sequential"] == cmap
+    assert mpl.colormaps["rho_heatmap_r"] == SEQUENTIAL["mpl_lava_r"]
+    assert theme["axes.prop_cycle"].by_key()["color"] == colors
+    assert rho_mpl.rho_light == light
+
+
+def test_alias_palettes_are_reused():
+    rho_mpl.setup(True, setup=False)
+    dark = SEQUENTIAL["mpl_sequential"]
+    rho_mpl.setup(False, setup=False)
+    light = SEQUENTIAL["mpl_sequential"]
+    assert light is not dark
+    rho_mpl.setup(True, setup=False)
+    assert SEQUENTIAL["mpl_sequential"] is dark
+    x = np.linspace(0, 1, 10)
+    assert np.allclose(light(x), dark(x[::-1]))
+
+
+@pytest.mark.skipif(not rho_mpl._PER_THREAD, reason="this Matplotlib has no per-thread rcParams")
+def test_theme_with_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from matplotlib.figure import Figure
+
+    import rho_plus
+
+    rho_mpl.setup(True)
+    before = dict(mpl.rcParams)
+    expected = {
+        is_dark: (
+            "#" + (rho_mpl.rho_dark if is_dark else rho_mpl.rho_light)["figure.facecolor"].lower(),
+            (rho_mpl.DARK_COLORS if is_dark else rho_mpl.LIGHT_COLORS)[0].lower(),
+            SEQUENTIAL["mpl_candela" if is_dark else "mpl_lava"],
+            SEQUENTIAL["mpl_inferna" if is_dark else "mpl_inferna_r"],
+        )
+        for is_dark in (False, True)
+    }
+    n_workers = 4
+    # every worker waits inside its theme block for the others, so the blocks have to overlap
+    barrier = threading.Barrier(n_workers, timeout=10)
+
+    def render(worker):
+        mismatches = []
+        for i in range(20):
+            is_dark = (i + worker) % 2 == 0
+            with rho_plus.theme(is_dark) as (_theme, _colors, cmaps):
+                barrier.wait()
+                with mpl.rc_context({"lines.linewidth": 3}):
+                    fig = Figure()
+                    ax = fig.add_subplot()
+                    (line,) = ax.plot([0, 1])
+                    heatmap = ax.imshow(np.eye(3), cmap=cmaps["rho_heatmap"])
+                    image = ax.imshow(np.eye(3))
+                    facecolor, color, heatmap_cmap, image_cmap = expected[is_dark]
+                    if (
+                        mpl.colors.to_hex(fig.get_facecolor()) != facecolor
+                        or mpl.colors.to_hex(line.get_color()) != color
+                        or line.get_linewidth() != 3
+                        or heatmap.get_cmap() != heatmap_cmap
+                        or image.get_cmap() != image_cmap
+                    ):
+                        mismatches.append((worker, i))
+                barrier.wait()
+        return mismatches
+
+    with ThreadPoolExecutor(n_workers) as executor:
+        assert sum(executor.map(render, range(n_workers)), []) == []
+
+    with rho_plus.theme(False) as (_, colors, _cmaps):
+        with rho_plus.theme(True):
+            assert mpl.rcParams["axes.prop_cycle"].by_key()["color"][0] == rho_mpl.DARK_COLORS[0]
+        assert mpl.rcParams["axes.prop_cycle"].by_key()["color"][0] == colors[0]
+        # other threads don't see the theme
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(lambda: dict(mpl.rcParams)).result() == before
+    assert dict(mpl.rcParams) == before
+    assert not set(vars(mpl.rcParams)) & {"_get", "_set", "_update_raw"}
+    assert mpl.colormaps["rho_heatmap"] == SEQUENTIAL["mpl_candela"]
@@ -0,0 +1,34 @@
+import pytest
+import matplotlib
+
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+
+from rho_plus.matplotlib_tweaks import line_labels
+
+
+def test_line_labels_stay_inside_axes():
+    fig, ax = plt.subplots()
+    for i in range(8):
+        ax.plot([0, 1], [0, 1 + i * 1e-3], label=f"line {i}")
+    ax.set_ylim(0, 1.01)
+    ax.legend()
+    line_labels(ax, weights=[10] + [1] * 7)
+
+    fig.canvas.draw()
+    bbox = ax.bbox
+    extents = sorted((text.get_window_extent() for text in ax.texts), key=lambda e: e.y0)
+    for below, above in zip(extents, extents[1:]):
+        assert below.y1 <= above.y0 + 1e-6
+    # the lines end at the top, so the labels are pushed down just far enough to fit
+    assert bbox.y0 <= extents[0].y0 and abs(extents[-1].y1 - bbox.y1) < 1e-6
+    plt.close(fig)
+
+
+def test_line_labels_custom_spread_weights():
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1], label="line")
+    ax.legend()
+    with pytest.raises(ValueError):
+        line_labels(ax, spread=lambda y, margin: y, weights=[1])
+    plt.close(fig)
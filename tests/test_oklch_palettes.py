@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from rho_plus.color_util import to_rgb_arr
+from rho_plus.sequential_palettes import SEQUENTIAL_DATA
+from rho_plus.oklch_palettes import (
+    OklchPalette,
+    hex2oklab,
+    hex2oklch,
+    oklab2hex,
+    oklab2srgb,
+    oklch2hex,
+    oklch2oklab,
+    oklch2scd,
+    srgb2oklab,
+)
+
+def colour_convert(colors, source, target):
+    colour = pytest.importorskip("colour")
+    with colour.utilities.suppress_warnings(colour_usage_warnings=True):
+        return np.array([colour.convert(c, source, target) for c in colors])
+
+
+def test_oklab_matches_colour():
+    rng = np.random.default_rng(0)
+    rgb = rng.random((200, 3))
+    lab = colour_convert(rgb, "sRGB", "Oklab")
+    assert np.allclose(srgb2oklab(rgb), lab, rtol=0, atol=1e-6)
+    assert np.allclose(oklab2srgb(lab), colour_convert(lab, "Oklab", "sRGB"), rtol=0, atol=1e-6)
+
+
+def test_hex_conversions():
+    hexs = ["#1846b3", "#355e00", "#bb8600", "#ffffff", "#000000"]
+    lab = colour_convert(to_rgb_arr(hexs), "sRGB", "Oklab")
+    assert np.allclose(hex2oklab(hexs), lab, rtol=0, atol=1e-6)
+    assert list(oklab2hex(lab)) == hexs
+    assert list(oklch2hex(hex2oklch(hexs))) == hexs
+    assert hex2oklch("#1846b3").shape == (1, 3)
+
+
+def test_scd_matches_colour():
+    rng = np.random.default_rng(1)
+    lch = np.column_stack([rng.random(200), rng.random(200) * 0.3, rng.random(200) * 360])
+    with np.errstate(invalid="ignore"):
+        scd = colour_convert(oklch2oklab(lch), "Oklab", "CAM16SCD")
+        ours = oklch2scd(lch)
+    valid = ~np.isnan(scd).any(axis=1)
+    assert valid.mean() > 0.8
+    assert np.allclose(ours[valid], scd[valid], rtol=0, atol=1e-6)
+
+
+def test_palette_samples():
+    palette = OklchPalette("test", [(0.34, 0.2, 260), (0.8, 0.2, 100)], [True], correct=False)
+    colors = palette.colors(5)
+    assert palette.colors(5) is colors
+    assert len(palette.hex_colors()) == 256
+    assert np.allclose(to_rgb_arr(colors), palette.rgb_samples(5), atol=1 / 255)
+
+    palette.correct()
+    assert palette.colors(5) is not colors
+
+    fine = OklchPalette(
+        "test", [(0.34, 0.2, 260), (0.8, 0.2, 100)], [True], resolution=4096, quantize=False
+    )
+    assert len(fine.hex_colors()) == 4096
+    assert np.all(np.diff(fine.oklab_samples(4096)[:, 0]) > 0)
+
+
+def test_serialized_palettes_are_reproduced():
+    # same definitions as scripts/serialize_palettes.py, one for each correction
+    palettes = [
+        OklchPalette(
+            "inferna",
+            [(0.34, 0.2, 260), (0.57, 0.15, 10), (0.8, 0.2, 100)],
+            [True, True],
+            correct=True,
+        ),
+        OklchPalette(
+            "lava",
+            [(0.95, 0.08, 115), (0.58, 0.16, 350), (0.2, 0.15, 280)],
+            (False, False),
+            correct="cam16",
+        ),
+        OklchPalette(
+            "spectra",
+            [(0.3, 0.2, 330), (0.96, 0.2, 120), (0.53, 0.2, 27)],
+            [False, False],
+            [0, 210, 300],
+            correct="gauss",
+        ),
+    ]
+    for palette in palettes:
+        assert list(palette.hex_colors()) == SEQUENTIAL_DATA[palette.name()]
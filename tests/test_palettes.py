@@ -0,0 +1,57 @@
+import numpy as np
+
+import matplotlib.colors as mpl_colors
+import pytest
+
+from rho_plus.palettes import SequentialPalette
+from rho_plus.sequential_palettes import SEQUENTIAL
+
+
+@pytest.mark.parametrize("name", ["lava", "lava_r"])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize(
+    "norm",
+    [
+        mpl_colors.Normalize(-2, 4),
+        mpl_colors.LogNorm(0.01, 5),
+        mpl_colors.SymLogNorm(0.5, vmin=-3, vmax=5, base=10),
+    ],
+)
+def test_map_matches_mpl(name, dtype, norm):
+    rng = np.random.default_rng(0)
+    values = (rng.normal(size=(100, 70)) * 3).astype(dtype)
+    values[0, :5] = np.nan
+    kind = {mpl_colors.Normalize: "linear", mpl_colors.LogNorm: "log"}.get(type(norm), "symlog")
+
+    colors = SEQUENTIAL[name].map(
+        values, norm.vmin, norm.vmax, norm=kind, linthresh=0.5, chunk_size=1000
+    )
+    assert colors.dtype == np.uint8 and colors.shape == values.shape + (4,)
+    assert np.array_equal(colors, SEQUENTIAL["mpl_" + name](norm(values), bytes=True))
+
+
+def test_map_options():
+    palette = SequentialPalette("test", ["#000000", "#ffffff"])
+    values = np.array([np.nan, -1, 0, 0.49, 0.5, 1, 2])
+
+    colors = palette.map(values, 0, 1, bad="red")
+    assert colors[:, 0].tolist() == [255, 0, 0, 0, 255, 255, 255]
+    assert colors[:, 3].tolist() == [255] * 7
+
+    floats = palette.rev().map(values, dtype=np.float32)
+    assert floats.dtype == np.float32
+    assert floats[1:, 0].tolist() == [1, 1, 1, 0, 0, 0]
+    assert floats[0].tolist() == [0, 0, 0, 0]
+
+    out = np.zeros((7, 5), dtype=np.uint8)
+    palette.map(values, 0, 1, out=out[:, :4])
+    assert np.array_equal(out[:, :4], palette.map(values, 0, 1)) and not out[:, 4].any()
+    with pytest.raises(ValueError):
+        palette.map(values, out=np.zeros((6, 4), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        palette.map(values, norm="sqrt")
+
+    assert palette.map(np.zeros(0)).shape == (0, 4)
+    assert palette.map(np.zeros((3, 0)), out=np.empty((3, 0, 4), dtype=np.uint8)).shape == (3, 0, 4)
+    with pytest.raises(ValueError):
+        palette.map(np.zeros(0), out=np.empty((1, 4), dtype=np.uint8))
@@ -0,0 +1,65 @@
+import gc
+import weakref
+
+import matplotlib
+
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from rho_plus._scatter_label import get_occupancy
+from rho_plus.render_cache import RenderCache, data_transform
+
+
+def test_hits_misses_and_eviction():
+    cache = RenderCache(maxsize=2)
+    fig = Figure()
+    assert cache.get(fig, "a", lambda: 1) == 1
+    assert cache.get(fig, "a", lambda: 2) == 1
+    cache.get(fig, "b", lambda: 3)
+    cache.get(fig, "a", lambda: 4)
+    # b is the least recently used
+    cache.get(fig, "c", lambda: 5)
+    assert cache.get(fig, "b", lambda: 6) == 6
+    assert cache.get(fig, "a", lambda: 7) == 7
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 5, 2)
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 2, 0)
+
+
+def test_draw_invalidates():
+    cache = RenderCache()
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    cache.get(fig, "a", lambda: 1)
+    fig.canvas.draw()
+    assert cache.get(fig, "a", lambda: 2) == 2
+
+
+def test_figures_are_not_kept_alive():
+    fig, ax = plt.subplots()
+    fig.canvas.draw()
+    get_occupancy(ax)
+    data_transform(ax)
+    ref = weakref.ref(fig)
+    plt.close(fig)
+    del fig, ax
+    gc.collect()
+    assert ref() is None
+
+
+def test_occupancy_sees_new_artists():
+    fig, ax = plt.subplots()
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    fig.canvas.draw()
+    center = ax.transData.transform((0.5, 0.5))
+    assert not get_occupancy(ax).intersects(*center, 4, 4)[0]
+
+    ax.scatter([0.5], [0.5], s=100)
+    fig.canvas.draw()
+    assert get_occupancy(ax).intersects(*center, 4, 4)[0]
+    plt.close(fig)
@@ -0,0 +1,51 @@
+import numpy as np
+
+import matplotlib
+
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+
+from rho_plus._scatter_label import Occupancy, get_occupancy, scatter_labels
+
+
+def test_occupancy_counts_match_brute_force():
+    rng = np.random.default_rng(0)
+    mask = rng.random((40, 60)) < 0.1
+    occupancy = Occupancy(mask, 10, 20)
+    ys, xs = np.nonzero(mask)
+    xs, ys = xs + 10, ys + 20
+
+    xc = rng.uniform(0, 80, 200)
+    yc = rng.uniform(10, 70, 200)
+    ww, hh = 7.5, 12.0
+    expected = [
+        np.sum((xs >= x - ww / 2) & (xs <= x + ww / 2) & (ys >= y - hh / 2) & (ys <= y + hh / 2))
+        for x, y in zip(xc, yc)
+    ]
+    assert np.array_equal(occupancy.counts(xc, yc, ww, hh), expected)
+    assert np.array_equal(occupancy.intersects(xc, yc, ww, hh), np.array(expected) > 0)
+
+
+def test_get_occupancy_finds_artists():
+    fig, ax = plt.subplots(dpi=100)
+    ax.set_axis_off()
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.scatter([0.25], [0.25], s=100)
+    fig.canvas.draw()
+    occupancy = get_occupancy(ax)
+
+    marker = ax.transData.transform((0.25, 0.25))
+    empty = ax.transData.transform((0.75, 0.75))
+    assert occupancy.intersects(*marker, 4, 4)[0]
+    assert not occupancy.intersects(*empty, 20, 20)[0]
+    plt.close(fig)
+
+
+def test_scatter_labels():
+    fig, ax = plt.subplots()
+    rng = np.random.default_rng(0)
+    ax.scatter(*rng.normal(size=(2, 10)))
+    scatter_labels([f"point {i}" for i in range(10)], ax=ax)
+    assert len(ax.texts) > 0
+    plt.close(fig)
@@ -0,0 +1,57 @@
+import matplotlib.colors as mpl_colors
+import numpy as np
+
+from rho_plus import sequential_palettes
+from rho_plus.sequential_palettes import (
+    ALIAS_DATA,
+    SEQUENTIAL,
+    SEQUENTIAL_ARRAYS,
+    SEQUENTIAL_DATA,
+    LazyPalettes,
+    load_binary,
+    load_json,
+    setup_cmap_aliases,
+)
+
+
+def test_lazy_palettes():
+    palettes = LazyPalettes()
+    palettes.register("test", ["#000000", "#ffffff"])
+    assert not palettes._cache
+    assert len(palettes) == len(list(palettes)) == 6
+
+    cmap = palettes["mpl_test_r"]
+    assert isinstance(cmap, mpl_colors.Colormap)
+    assert palettes["mpl_test_r"] is cmap
+    assert list(palettes["list_test_r"]) == ["#ffffff", "#000000"]
+    assert "test_r" in palettes and "test_x" not in palettes
+
+    palettes.register("test", ["#ff0000", "#0000ff"])
+    assert palettes["mpl_test_r"] is not cmap
+    assert list(palettes["list_test"]) == ["#ff0000", "#0000ff"]
+
+
+def test_binary_matches_json():
+    binary = load_binary()
+    json_data = load_json()
+    assert list(binary) == list(json_data)
+    for name, colors in json_data.items():
+        assert binary[name].dtype == np.uint8 and binary[name].shape == (len(colors), 3)
+        assert SEQUENTIAL["list_" + name] == colors
+
+    assert dict(SEQUENTIAL_DATA) == json_data
+    assert ALIAS_DATA[False]["sequential"] == json_data["inferna"][::-1]
+
+    arr = SEQUENTIAL_ARRAYS["lava"]
+    assert np.array_equal(SEQUENTIAL["mpl_lava"](np.linspace(0, 1, len(arr)), bytes=True)[:, :3], arr)
+
+
+def test_module_attributes():
+    assert sequential_palettes.list_lava == SEQUENTIAL_DATA["lava"]
+    assert sequential_palettes.inferna_r.name() == "inferna_r"
+    assert "mpl_candela" in dir(sequential_palettes)
+
+    setup_cmap_aliases(True)
+    dark = SEQUENTIAL["list_heatmap"]
+    setup_cmap_aliases(False)
+    assert SEQUENTIAL["list_heatmap"] == SEQUENTIAL["list_lava"] != dark
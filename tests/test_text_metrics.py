@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import matplotlib
+
+matplotlib.use("agg")
+import matplotlib.pyplot as plt
+
+from rho_plus import text_metrics
+from rho_plus.text_metrics import line_metrics, text_extents
+
+TEXTS = ["label", "two\nlines", "$x^2 + \\alpha$", "line $\\beta$\nsecond", "Wg", ""]
+
+
+@pytest.mark.parametrize("font_metrics", [True, False])
+@pytest.mark.parametrize(
+    "kwargs", [{}, dict(fontsize=20, fontweight="bold", family="serif"), dict(linespacing=1.5)]
+)
+def test_text_extents_match_artists(kwargs, font_metrics, monkeypatch):
+    if font_metrics and not text_metrics.FONT_METRICS:
+        pytest.skip("text_metrics copies the Text layout of another Matplotlib release")
+    monkeypatch.setattr(text_metrics, "FONT_METRICS", font_metrics)
+    fig, ax = plt.subplots(dpi=150)
+    fig.canvas.draw()
+    expected = []
+    for text in TEXTS:
+        artist = ax.text(0.5, 0.5, text, **kwargs)
+        bbox = artist.get_window_extent()
+        artist.remove()
+        expected.append((bbox.width, bbox.height))
+    plt.close(fig)
+    assert np.allclose(text_extents(TEXTS, fig.dpi, **kwargs), expected)
+
+
+def test_text_extents_are_cached(monkeypatch):
+    monkeypatch.setattr(text_metrics, "FONT_METRICS", True)
+    text_extents(["cached label"], 100)
+    hits = line_metrics.cache_info().hits
+    text_extents(["cached label"], 100)
+    assert line_metrics.cache_info().hits == hits + 1
+    assert text_extents([], 100).shape == (0, 2)
@@ -0,0 +1,48 @@
+import dataclasses
+import subprocess
+import sys
+
+from rho_plus.theme_tokens import Sizes, bokeh_theme, mpl_theme, theme_tokens, vega_theme
+
+
+def test_tokens_are_cached():
+    assert theme_tokens(True) is theme_tokens(1)
+    assert theme_tokens(True) != theme_tokens(False)
+    assert hash(theme_tokens(False))
+    assert len(theme_tokens(False).sequential) == 256
+
+
+def test_emitters():
+    tokens = theme_tokens(True)
+    assert mpl_theme(tokens)["axes.facecolor"] == tokens.shades.empty[1:]
+    assert bokeh_theme(tokens)["attrs"]["figure"]["background_fill_color"] == tokens.shades.empty
+    assert vega_theme(tokens)["config"]["range"]["category"] == list(tokens.colors)
+    assert vega_theme(tokens) == vega_theme(theme_tokens(True))
+
+
+def test_emitters_only_read_tokens():
+    tokens = dataclasses.replace(
+        theme_tokens(False),
+        wide_heatmap=("#000000", "#ffffff"),
+        ramp=("#ff0000",),
+        sizes=Sizes(font=10, label=32, web_line=5),
+    )
+    vega = vega_theme(tokens)["config"]
+    assert set(vega["range"]["heatmap"]) == {"#000000", "#ffffff"}
+    assert set(vega["range"]["ramp"]) == {"#ff0000"}
+    assert vega["style"]["guide-label"]["fontSize"] == 32 and vega["line"]["strokeWidth"] == 5
+    assert bokeh_theme(tokens)["attrs"]["Legend"]["label_text_font_size"] == "2em"
+    assert mpl_theme(tokens)["font.size"] == 10
+
+
+def test_emitters_have_no_side_effects():
+    code = (
+        "import sys\n"
+        "from rho_plus.theme_tokens import *\n"
+        "for is_dark in (True, False):\n"
+        "    tokens = theme_tokens(is_dark)\n"
+        "    mpl_theme(tokens), bokeh_theme(tokens), vega_theme(tokens)\n"
+        "print([m for m in ('matplotlib.pyplot', 'bokeh', 'altair') if m in sys.modules])\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,68 @@
+import numpy as np
+
+import matplotlib.image as mpl_image
+import pytest
+
+from rho_plus import tiles
+from rho_plus.sequential_palettes import SEQUENTIAL
+
+
+@pytest.fixture
+def field(tmp_path):
+    values = np.random.default_rng(0).normal(size=(300, 217)).astype(np.float32)
+    values[3, 3] = np.nan
+    np.save(tmp_path / "field.npy", values)
+    return values
+
+
+def read_png(path):
+    return np.rint(mpl_image.imread(path) * 255).astype(np.uint8)
+
+
+def test_field_range(field, tmp_path):
+    assert tiles.field_range(tmp_path / "field.npy", tile_rows=7) == (
+        np.nanmin(field),
+        np.nanmax(field),
+    )
+    assert tiles.field_range(field, norm="log")[0] > 0
+
+
+def test_render_png(field, tmp_path):
+    tiles.render_png(tmp_path / "field.npy", tmp_path / "serial.png", "lava", tile_rows=64)
+    assert np.array_equal(read_png(tmp_path / "serial.png"), SEQUENTIAL["lava"].map(field))
+
+    tiles.render_png(field, tmp_path / "pool.png", SEQUENTIAL["lava"], tile_rows=64, processes=2)
+    assert (tmp_path / "pool.png").read_bytes() == (tmp_path / "serial.png").read_bytes()
+
+
+def test_downsample():
+    field = np.array([[1, 2, 3], [3, np.nan, 5], [np.nan, np.nan, 7]])
+    out = tiles.downsample(field, np.empty((2, 2)), tile_rows=1)
+    assert np.array_equal(out, [[2, 4], [np.nan, 7]], equal_nan=True)
+
+
+def test_render_tiles(field, tmp_path):
+    max_zoom = tiles.render_tiles(
+        tmp_path / "field.npy", tmp_path / "tiles", "candela", tile_size=64, tile_rows=50
+    )
+    assert max_zoom == 3
+    assert sorted(p.name for p in (tmp_path / "tiles" / "3").iterdir()) == ["0", "1", "2", "3"]
+
+    top = read_png(tmp_path / "tiles" / "3" / "1" / "0.png")
+    colors = SEQUENTIAL["candela"].map(field, np.nanmin(field), np.nanmax(field))
+    assert np.array_equal(top, colors[:64, 64:128])
+
+    # partial tiles are padded with transparency
+    corner = read_png(tmp_path / "tiles" / "3" / "3" / "4.png")
+    assert corner[:300 - 256, :217 - 192, 3].all() and not corner[300 - 256 :, :, 3].any()
+    assert read_png(tmp_path / "tiles" / "0" / "0" / "0.png")[:38, :28, 3].all()
+
+
+@pytest.mark.parametrize("window", [np.s_[10:30, 5:25], np.s_[40:200], np.s_[::3]])
+def test_render_png_memmap_views(field, tmp_path, window):
+    view = np.load(tmp_path / "field.npy", mmap_mode="r")[window]
+    tiles.render_png(view, tmp_path / "serial.png", vmin=-2, vmax=2, tile_rows=7)
+    tiles.render_png(view, tmp_path / "parallel.png", vmin=-2, vmax=2, tile_rows=7, processes=2)
+    assert np.array_equal(read_png(tmp_path / "parallel.png"), read_png(tmp_path / "serial.png"))
+    expected = SEQUENTIAL["lava"].map(field[window], -2, 2)
+    assert np.array_equal(read_png(tmp_path / "parallel.png"), expected)
@@ -0,0 +1,277 @@
+import types
+
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from rho_plus.util import (
+    _names,
+    allow_expression_column,
+    compile_expression,
+    decorate_all,
+    eval_expression,
+    isotonic_mean,
+    isotonic_median,
+    spread,
+    undecorate,
+)
+
+
+def make_module():
+    module = types.ModuleType("fake_plotting")
+
+    def plot(data=None, x=None):
+        return data[x].tolist()
+
+    def other(a, b):
+        return a + b
+
+    module.plot = plot
+    module.other = other
+    return module
+
+
+class Base:
+    def plot(self, data=None, x=None):
+        return data[x].tolist()
+
+
+class Child(Base):
+    pass
+
+
+def wrapper_depth(func):
+    depth = 0
+    while hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+        depth += 1
+    return depth
+
+
+def test_decorate_all_wraps_once():
+    module = make_module()
+    plot, other = module.plot, module.other
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+
+    for _ in range(5):
+        decorate_all(module)
+        assert wrapper_depth(module.plot) == 1
+        assert module.plot(data=df, x="a + b") == [4, 6]
+    assert module.other is other
+    assert allow_expression_column(module.plot) is module.plot
+    assert allow_expression_column(plot) is module.plot
+
+    undecorate(module)
+    assert module.plot is plot
+
+
+def test_undecorate_class():
+    decorate_all(Child)
+    assert "plot" in vars(Child) and wrapper_depth(Child.plot) == 1
+    df = pd.DataFrame({"a": [1, 2]})
+    assert Child().plot(data=df, x="a * 2") == [2, 4]
+    undecorate(Child)
+    assert "plot" not in vars(Child) and Child.plot is Base.plot
+
+
+def test_expression_columns():
+    df = pd.DataFrame({"a": [1.0, 2.0, 4.0], "b": [3.0, 5.0, 7.0], "x y": [1.0, 0.0, 2.0]})
+    seen = []
+
+    @allow_expression_column
+    def plot(data=None, x=None, y=None, hue=None):
+        seen.append(data)
+        return data[x].tolist(), data[y].tolist()
+
+    for expr in ["a + b", "log(a) * 5", "`x y` / 2", "a > b", "a ** 2 - -b", "(a > 1) & (b < 6)", "a < b < 8"]:
+        assert plot(data=df, x=expr, y="a")[0] == df.eval(expr).tolist()
+
+    plot(df, "a", "b", hue="banana")
+    assert seen[-1] is df
+    assert list(df.columns) == ["a", "b", "x y"]
+    assert plot(df, "a * 2", "a * 2") == ([2.0, 4.0, 8.0], [2.0, 4.0, 8.0])
+    assert list(seen[-1].columns) == ["a", "b", "x y", "a * 2"]
+
+
+MIXED_BOOLEANS = [
+    "a > 1 | b",
+    "a > 1 & b < 2 | a == 0",
+    "a < b < 4 | c == 'x'",
+    "~(a > 1) | (b > 2)",
+    "a ** 2 > b & c != 'y'",
+    "a + b * 2 >= 3 | a < b",
+    "c == 'a|b' | a > 1",
+    "i & j",
+]
+
+
+@pytest.mark.parametrize("expr", MIXED_BOOLEANS)
+def test_expression_precedence_matches_eval(expr):
+    df = pd.DataFrame(
+        {"a": [0.0, 1.0, 2.0], "b": [1, 0, 3], "c": ["x", "y", "x"], "i": [1, 2, 3], "j": [3, 3, 1]}
+    )
+    columns = set(df.columns)
+    # runs on the fast path, not through df.eval
+    assert compile_expression(expr, frozenset(columns & _names(expr))) is not None
+    assert eval_expression(df, expr, columns).tolist() == df.eval(expr).tolist()
+
+
+@pytest.mark.parametrize("kind", ["polars", "pyarrow"])
+def test_native_tables(kind):
+    df = pd.DataFrame({"a": [1.0, 2.0, 4.0], "b": [3.0, 5.0, 7.0], "c": ["x", "y", "z"]})
+    if kind == "polars":
+        pl = pytest.importorskip("polars")
+        table = pl.from_pandas(df)
+    else:
+        pa = pytest.importorskip("pyarrow")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    @allow_expression_column
+    def plot(data=None, x=None, y=None, hover_data=None):
+        return data
+
+    data = plot(table, "log(a) * 5", "b", hover_data=["c"])
+    assert list(data) == ["b", "c", "log(a) * 5"]
+    assert np.allclose(data["log(a) * 5"], df.eval("log(a) * 5"))
+    assert data["c"].tolist() == ["x", "y", "z"]
+    assert np.allclose(plot(data=table, x="a + b")["a + b"], [4, 7, 11])
+    assert plot(table, "a") is table
+
+
+def test_polars_expressions_match_eval():
+    pl = pytest.importorskip("polars")
+    df = pd.DataFrame(
+        {"a": [0.0, 1.0, 2.0], "b": [1, 0, 3], "c": ["x", "y", "x"], "i": [1, 2, 3], "j": [3, 3, 1]}
+    )
+
+    @allow_expression_column
+    def plot(data=None, x=None):
+        return data
+
+    table = pl.from_pandas(df)
+    # Polars doesn't | booleans with integers
+    for expr in MIXED_BOOLEANS[1:] + ["0 < a < 2", "a > 1 | b > 0", "a ** 2 + log1p(b)"]:
+        assert np.allclose(plot(table, expr)[expr], df.eval(expr))
+    with pytest.raises(ValueError, match="Polars"):
+        plot(table, "a.abs() + b")
+
+
+@pytest.mark.parametrize(
+    "x, margin, expected",
+    [
+        ([3, 1, 2], 0.5, [3, 1, 2]),
+        ([5, 5, 5, 9], 1, [3, 5, 7, 9]),
+        ([0, 1, 2, 10, 11, 12], [1, 1, 1, 2, 2, 2], [-1, 1, 3, 7, 11, 15]),
+        ([10, 0, 3, 7, 8], [0.5, 1, 1.5, 1, 0.5], [10, 0, 3, 6.75, 8.25]),
+        # moving 4, 5, 6 apart pushes 4 into 0, so all four move together
+        ([0, 4, 5, 6], 1.5, [-0.75, 2.25, 5.25, 8.25]),
+    ],
+)
+def test_spread(x, margin, expected):
+    assert np.allclose(spread(x, margin), expected)
+
+
+def test_spread_is_optimal():
+    from scipy.optimize import minimize
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        x = rng.uniform(0, 20, 8)
+        margin = rng.uniform(0.5, 2, 8)
+        order = np.argsort(x, kind="stable")
+        gaps = (margin[order][1:] + margin[order][:-1])
+        y = spread(x, margin)
+        assert np.all(np.diff(y[order]) >= gaps - 1e-9)
+
+        best = minimize(
+            lambda y: ((y - x) ** 2).sum(),
+            x,
+            constraints=[{"type": "ineq", "fun": lambda y: np.diff(y[order]) - gaps}],
+        )
+        assert ((y - x) ** 2).sum() <= best.fun + 1e-6
+
+
+def test_spread_many_labels():
+    x = np.zeros(5000)
+    y = spread(x, 0.5)
+    # ties keep their order, centered on where they started
+    assert np.allclose(np.diff(y), 1)
+    assert np.isclose(y.mean(), 0)
+
+
+def test_isotonic_mean():
+    assert np.allclose(isotonic_mean([1, 3, 2, 4, 0]), [1, 2.25, 2.25, 2.25, 2.25])
+    assert np.allclose(isotonic_mean([1, 2, 3]), [1, 2, 3])
+
+
+def test_isotonic_median():
+    assert np.allclose(isotonic_median([1, 5, 2, 2, 9]), [1, 2, 2, 2, 9])
+    assert np.allclose(isotonic_median([3, 0], [2, 1]), [3, 3])
+    assert np.allclose(isotonic_mean([3, 0], [2, 1]), [2, 2])
+
+
+def test_spread_weights():
+    # the heavy point stays put
+    assert np.allclose(spread([0, 1], 1, weights=[100, 1], loss="absolute"), [0, 2])
+    y = spread([0, 1], 1, weights=[3, 1])
+    assert np.allclose(y, [-0.25, 1.75])
+
+
+@pytest.mark.parametrize("fit", [isotonic_mean, isotonic_median])
+def test_zero_weights(fit):
+    # zero weights pool with the point before them, or after them at the start
+    assert np.allclose(fit([3, 0, 1, 5], [1, 0, 1, 0]), fit([3, 1]).repeat(2))
+    assert np.allclose(fit([1, 0], [0, 1]), [0, 0])
+    assert np.allclose(fit([1, 0], [0, 0]), fit([1, 0]))
+    with pytest.raises(ValueError):
+        fit([1, 0], [-1, 1])
+
+
+def test_spread_zero_weights():
+    assert np.allclose(spread([1, 0], 1, weights=[0, 0]), spread([1, 0], 1))
+    with pytest.raises(ValueError):
+        spread([1, 0], 1, weights=[1, np.nan])
+
+
+def test_spread_bounds():
+    y = spread([0, 0.5, 9.8], 0.5, lower=0, upper=10)
+    assert np.allclose(y, [0.5, 1.5, 9.5])
+    # the bounds don't move points that already fit
+    assert np.allclose(spread([2, 5], 0.5, lower=0, upper=10), [2, 5])
+
+
+def test_spread_variants_are_optimal():
+    from scipy.optimize import linprog, minimize
+
+    rng = np.random.default_rng(1)
+    lower, upper = -1, 22
+    for _ in range(20):
+        x = rng.uniform(0, 20, 6)
+        margin = rng.uniform(0.5, 1.5, 6)
+        weights = rng.uniform(0.1, 5, 6)
+        order = np.argsort(x, kind="stable")
+        gaps = margin[order][1:] + margin[order][:-1]
+        constraints = [
+            {"type": "ineq", "fun": lambda y: np.diff(y[order]) - gaps},
+            {"type": "ineq", "fun": lambda y: y - margin - lower},
+            {"type": "ineq", "fun": lambda y: upper - margin - y},
+        ]
+
+        y = spread(x, margin, weights, lower, upper)
+        for constraint in constraints:
+            assert np.all(constraint["fun"](y) >= -1e-9)
+        best = minimize(
+            lambda y: (weights * (y - x) ** 2).sum(), np.clip(x, 2, 18), constraints=constraints
+        )
+        assert (weights * (y - x) ** 2).sum() <= best.fun + 1e-6
+
+        # absolute loss as a linear program over the points and their distances to x
+        y = spread(x, margin, weights, lower, upper, loss="absolute")
+        eye = np.eye(6)
+        a_ub = [np.r_[eye[i], -eye[i]] for i in range(6)] + [np.r_[-eye[i], -eye[i]] for i in range(6)]
+        a_ub += [np.r_[eye[i] - eye[j], np.zeros(6)] for i, j in zip(order[:-1], order[1:])]
+        b_ub = np.r_[x, -x, -gaps]
+        bounds = [(lower + m, upper - m) for m in margin] + [(0, None)] * 6
+        best = linprog(np.r_[np.zeros(6), weights], a_ub, b_ub, bounds=bounds)
+        assert (weights * abs(y - x)).sum() <= best.fun + 1e-6